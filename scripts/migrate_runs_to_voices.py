@@ -5,9 +5,22 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import re
 import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+
+# runs/downloads/ -> media/downloads/
+# runs/voice-clones/ -> voices/
+# runs/voices/<voice>/<version>/ -> voices/<voice>/<version>/runs/
+LEGACY_PATH_RE = re.compile(
+    r"runs/(?:(?P<downloads>downloads/)|(?P<clones>voice-clones/)"
+    r'|voices/(?P<voice>[^/"]*)/(?P<version>[^/"]*)/)'
+)
+LOG_FLUSH_LINES = 256
 
 
 def parse_args() -> argparse.Namespace:
@@ -28,125 +41,238 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def log(message: str) -> None:
-    print(message, flush=True)
+_log_lock = threading.Lock()
+_log_buffer: list[str] = []
+_log_buffered = False
 
 
-def move_tree(src: Path, dst: Path, dry_run: bool) -> None:
-    """Merge-move src into dst, keeping existing files in dst."""
-    if not src.exists():
+def set_log_buffering(enabled: bool) -> None:
+    global _log_buffered
+    flush_log()
+    _log_buffered = enabled
+
+
+def log(message: str) -> None:
+    if not _log_buffered:
+        print(message, flush=True)
         return
+    # Move workers log concurrently; batch their lines into one write per LOG_FLUSH_LINES.
+    with _log_lock:
+        _log_buffer.append(message + "\n")
+        if len(_log_buffer) >= LOG_FLUSH_LINES:
+            _write_log_buffer()
 
-    if not dst.exists():
-        if dry_run:
-            log(f"[dry-run] move {src} -> {dst}")
-            return
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(src), str(dst))
+
+def flush_log() -> None:
+    with _log_lock:
+        _write_log_buffer()
+
+
+def _write_log_buffer() -> None:
+    if not _log_buffer:
         return
+    sys.stdout.write("".join(_log_buffer))
+    sys.stdout.flush()
+    _log_buffer.clear()
 
-    if src.is_file():
-        if dry_run:
-            if dst.exists():
-                log(f"[dry-run] skip existing file {dst} (source: {src})")
-            else:
-                log(f"[dry-run] move file {src} -> {dst}")
-            return
-        if not dst.exists():
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            shutil.move(str(src), str(dst))
+
+def list_subdirs(path: Path | str) -> list[os.DirEntry[str]]:
+    with os.scandir(path) as entries:
+        return [entry for entry in entries if entry.is_dir()]
+
+
+def dir_is_empty(path: Path | str) -> bool:
+    with os.scandir(path) as entries:
+        return next(entries, None) is None
+
+
+def rename_or_move(src: str, dst: str) -> None:
+    """Rename src to a not-yet-existing dst, falling back to shutil.move across filesystems."""
+    try:
+        os.rename(src, dst)
+    except OSError:
+        shutil.move(src, dst)
+
+
+def move_tree(src: Path, dst: Path, dry_run: bool) -> None:
+    """Merge-move src into dst, keeping existing files in dst.
+
+    dst.parent must already exist; move_trees creates it up front.
+    """
+    # The merge walk works on plain strings; Path arithmetic per entry adds up on big trees.
+    pending = [(str(src), str(dst))]
+    merged_dirs: list[str] = []
+    while pending:
+        src_path, dst_path = pending.pop()
+        if not os.path.exists(src_path):
+            continue
+
+        if os.path.isdir(dst_path) and os.path.isdir(src_path) and dir_is_empty(dst_path):
+            # An empty destination has nothing to keep; replace it with one rename.
+            if dry_run:
+                log(f"[dry-run] move {src_path} -> {dst_path} (replacing empty directory)")
+                continue
+            os.rmdir(dst_path)
+
+        if not os.path.exists(dst_path):
+            if dry_run:
+                log(f"[dry-run] move {src_path} -> {dst_path}")
+                continue
+            rename_or_move(src_path, dst_path)
+            continue
+
+        if os.path.isfile(src_path):
+            if dry_run:
+                log(f"[dry-run] skip existing file {dst_path} (source: {src_path})")
+            continue
+
+        with os.scandir(src_path) as entries:
+            children = list(entries)
+        for entry in children:
+            child_dst = os.path.join(dst_path, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                pending.append((entry.path, child_dst))
+            elif dry_run:
+                if os.path.exists(child_dst):
+                    log(f"[dry-run] skip existing file {child_dst} (source: {entry.path})")
+                else:
+                    log(f"[dry-run] move file {entry.path} -> {child_dst}")
+            elif not os.path.exists(child_dst):
+                rename_or_move(entry.path, child_dst)
+        merged_dirs.append(src_path)
+
+    if dry_run:
         return
+    # Parents were recorded before their children, so reverse order removes leaves first.
+    for merged_dir in reversed(merged_dirs):
+        try:
+            os.rmdir(merged_dir)
+        except OSError:
+            pass
 
-    for child in src.iterdir():
-        move_tree(child, dst / child.name, dry_run=dry_run)
 
+def move_trees(moves: list[tuple[Path, Path]], dry_run: bool) -> None:
+    """Run independent move_tree calls concurrently; returns once all have finished."""
+    if not moves:
+        return
     if dry_run:
+        # Nothing is moved, so run in sorted order to keep the planned-move log stable.
+        for src, dst in sorted(moves):
+            move_tree(src, dst, dry_run)
         return
-    try:
-        src.rmdir()
-    except OSError:
-        pass
+    for parent in {dst.parent for _src, dst in moves}:
+        os.makedirs(parent, exist_ok=True)
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(moves))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(move_tree, src, dst, dry_run) for src, dst in moves]
+        for future in futures:
+            future.result()
+
+
+def rewrite_legacy_prefix(match: re.Match[str]) -> str:
+    """LEGACY_PATH_RE.sub callback: build the new-layout prefix from the match's groups."""
+    if match.group("downloads"):
+        return "media/downloads/"
+    if match.group("clones"):
+        return "voices/"
+    return f"voices/{match.group('voice')}/{match.group('version')}/runs/"
 
 
 def rewrite_path_string(value: str) -> str:
-    updated = value.replace("runs/downloads/", "media/downloads/")
-    updated = updated.replace("/runs/downloads/", "/media/downloads/")
-
-    idx = updated.find("runs/voice-clones/")
-    if idx != -1:
-        prefix = updated[:idx]
-        rest = updated[idx + len("runs/voice-clones/") :]
-        updated = f"{prefix}voices/{rest}"
-
-    idx = updated.find("runs/voices/")
-    if idx != -1:
-        prefix = updated[:idx]
-        rest = updated[idx + len("runs/voices/") :]
-        parts = rest.split("/", 2)
-        if len(parts) >= 3:
-            voice, version, tail = parts
-            updated = f"{prefix}voices/{voice}/{version}/runs/{tail}"
-    return updated
-
-
-def rewrite_manifest_obj(value: Any) -> tuple[Any, bool]:
-    if isinstance(value, str):
-        rewritten = rewrite_path_string(value)
-        return rewritten, rewritten != value
-    if isinstance(value, list):
-        changed = False
-        items: list[Any] = []
-        for item in value:
-            rewritten_item, item_changed = rewrite_manifest_obj(item)
-            items.append(rewritten_item)
-            changed = changed or item_changed
-        return items, changed
-    if isinstance(value, dict):
-        changed = False
-        updated: dict[str, Any] = {}
-        for key, child in value.items():
-            rewritten_child, child_changed = rewrite_manifest_obj(child)
-            updated[key] = rewritten_child
-            changed = changed or child_changed
-        return updated, changed
-    return value, False
+    """Rewrite every legacy runs/* path prefix in value to the voices/ + media/ layout.
+
+    Works on a single path or on a whole manifest's raw JSON text.
+    """
+    # Every legacy prefix starts with "runs/"; most values have none and return as-is.
+    if "runs/" not in value:
+        return value
+    return LEGACY_PATH_RE.sub(rewrite_legacy_prefix, value)
+
+
+def find_manifests(voices_root: Path) -> list[Path]:
+    """Return voices/<voice>/<version>/**/run_manifest.json paths, sorted."""
+    if not voices_root.is_dir():
+        return []
+    manifests: list[Path] = []
+    for voice_dir in list_subdirs(voices_root):
+        for version_dir in list_subdirs(voice_dir.path):
+            for root, _dirs, files in os.walk(version_dir.path):
+                if "run_manifest.json" in files:
+                    manifests.append(Path(root, "run_manifest.json"))
+    return sorted(manifests)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Write text to a sibling temp file, then os.replace it over path."""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 def rewrite_manifests(voices_root: Path, dry_run: bool) -> None:
-    manifests = sorted(voices_root.glob("*/*/**/run_manifest.json"))
+    manifests = find_manifests(voices_root)
     for manifest_path in manifests:
         try:
             raw = manifest_path.read_text(encoding="utf-8")
-            data = json.loads(raw)
         except Exception:
             log(f"Skipping unreadable manifest: {manifest_path}")
             continue
+        # Already-migrated manifests are the common case; skip them without parsing.
+        if "runs/" not in raw:
+            continue
 
-        rewritten, changed = rewrite_manifest_obj(data)
-        if not changed:
+        # Rewrite the raw text so untouched bytes (formatting, key order) survive verbatim.
+        rewritten = rewrite_path_string(raw)
+        if rewritten == raw:
+            continue
+        # The prefix rewrite can't repair a corrupt manifest, so one parse of the result
+        # rejects both corrupt input and a rewrite that broke the JSON.
+        try:
+            json.loads(rewritten)
+        except ValueError:
+            log(f"Skipping unreadable manifest: {manifest_path}")
             continue
 
         if dry_run:
             log(f"[dry-run] rewrite manifest paths: {manifest_path}")
             continue
 
-        manifest_path.write_text(json.dumps(rewritten, indent=2) + "\n", encoding="utf-8")
+        write_text_atomic(manifest_path, rewritten)
         log(f"Rewrote manifest paths: {manifest_path}")
 
 
 def remove_if_empty(path: Path) -> None:
-    if not path.exists() or not path.is_dir():
+    if not path.is_dir():
         return
-    for child in path.iterdir():
-        if child.is_dir():
-            remove_if_empty(child)
-    try:
-        path.rmdir()
-    except OSError:
-        pass
+    # Post-order walk: children are visited (and removed if empty) before parents.
+    for root, _dirs, _files in os.walk(path, topdown=False):
+        try:
+            os.rmdir(root)
+        except OSError:
+            pass
 
 
-def migrate(repo_root: Path, dry_run: bool) -> None:
+def remove_ds_store_files(path: Path) -> None:
+    """Delete every .DS_Store under path so they don't block empty-directory cleanup."""
+    for root, _dirs, files in os.walk(path):
+        if ".DS_Store" in files:
+            try:
+                os.unlink(os.path.join(root, ".DS_Store"))
+            except OSError:
+                pass
+
+
+def build_migration_plan(repo_root: Path) -> list[list[tuple[Path, Path]]]:
+    """Discover every top-level (src, dst) move up front, grouped into ordered phases.
+
+    Sources in different phases live under different legacy roots, so the whole
+    plan can be built with one scan before anything moves.
+    """
     runs_root = repo_root / "runs"
     old_clones_root = runs_root / "voice-clones"
     old_generations_root = runs_root / "voices"
@@ -156,25 +282,42 @@ def migrate(repo_root: Path, dry_run: bool) -> None:
     media_downloads_root = repo_root / "media" / "downloads"
 
     # 1) Clone profiles: runs/voice-clones/<voice>/<version> -> voices/<voice>/<version>
+    clone_moves: list[tuple[Path, Path]] = []
     if old_clones_root.exists():
-        for voice_dir in sorted(p for p in old_clones_root.iterdir() if p.is_dir()):
-            for version_dir in sorted(p for p in voice_dir.iterdir() if p.is_dir()):
+        for voice_dir in list_subdirs(old_clones_root):
+            for version_dir in list_subdirs(voice_dir.path):
                 target = voices_root / voice_dir.name / version_dir.name
-                move_tree(version_dir, target, dry_run=dry_run)
+                clone_moves.append((Path(version_dir.path), target))
 
     # 2) Generation runs: runs/voices/<voice>/<version>/<run> -> voices/<voice>/<version>/runs/<run>
+    run_moves: list[tuple[Path, Path]] = []
     if old_generations_root.exists():
-        for voice_dir in sorted(p for p in old_generations_root.iterdir() if p.is_dir()):
-            for version_dir in sorted(p for p in voice_dir.iterdir() if p.is_dir()):
-                for run_dir in sorted(p for p in version_dir.iterdir() if p.is_dir()):
+        for voice_dir in list_subdirs(old_generations_root):
+            for version_dir in list_subdirs(voice_dir.path):
+                for run_dir in list_subdirs(version_dir.path):
                     target = voices_root / voice_dir.name / version_dir.name / "runs" / run_dir.name
-                    move_tree(run_dir, target, dry_run=dry_run)
+                    run_moves.append((Path(run_dir.path), target))
 
     # 3) Download cache: runs/downloads/* -> media/downloads/*
+    download_moves: list[tuple[Path, Path]] = []
     if old_downloads_root.exists():
-        for download_entry in sorted(old_downloads_root.iterdir()):
-            target = media_downloads_root / download_entry.name
-            move_tree(download_entry, target, dry_run=dry_run)
+        with os.scandir(old_downloads_root) as download_entries:
+            download_moves = [
+                (Path(download_entry.path), media_downloads_root / download_entry.name)
+                for download_entry in download_entries
+            ]
+
+    return [clone_moves, run_moves, download_moves]
+
+
+def migrate(repo_root: Path, dry_run: bool) -> None:
+    runs_root = repo_root / "runs"
+    voices_root = repo_root / "voices"
+
+    # Each phase's moves touch disjoint targets, so they run on a thread pool;
+    # phases stay sequential so later phases see the previous one's results.
+    for phase_moves in build_migration_plan(repo_root):
+        move_trees(phase_moves, dry_run=dry_run)
 
     # 4) Rewrite manifest artifact paths to the new layout.
     rewrite_manifests(voices_root=voices_root, dry_run=dry_run)
@@ -183,18 +326,10 @@ def migrate(repo_root: Path, dry_run: bool) -> None:
         return
 
     # 5) Best-effort cleanup for now-empty legacy directories.
-    for ds_store in (
-        runs_root / ".DS_Store",
-        old_clones_root / ".DS_Store",
-    ):
-        if ds_store.exists():
-            try:
-                ds_store.unlink()
-            except OSError:
-                pass
-    remove_if_empty(old_clones_root)
-    remove_if_empty(old_generations_root)
-    remove_if_empty(old_downloads_root)
+    remove_ds_store_files(runs_root)
+    remove_if_empty(runs_root / "voice-clones")
+    remove_if_empty(runs_root / "voices")
+    remove_if_empty(runs_root / "downloads")
     remove_if_empty(runs_root)
 
 
@@ -205,10 +340,15 @@ def main() -> int:
         print(f"ERROR: repo root does not exist: {repo_root}", flush=True)
         return 2
 
-    log(f"Repo root: {repo_root}")
-    log(f"Dry run: {args.dry_run}")
-    migrate(repo_root=repo_root, dry_run=args.dry_run)
-    log("Migration completed.")
+    # Keep line-by-line output for dry runs and interactive terminals.
+    set_log_buffering(not args.dry_run and not sys.stdout.isatty())
+    try:
+        log(f"Repo root: {repo_root}")
+        log(f"Dry run: {args.dry_run}")
+        migrate(repo_root=repo_root, dry_run=args.dry_run)
+        log("Migration completed.")
+    finally:
+        flush_log()
     return 0
 
 
@@ -4,34 +4,38 @@
 from __future__ import annotations
 
 import argparse
-import csv
+import atexit
 import datetime as dt
+import functools
 import hashlib
 import importlib.util
+import itertools
 import json
+import math
+import os
 import re
 import shlex
 import shutil
-import subprocess
+import string
 import sys
+import threading
+import time
+from collections import deque
 from contextlib import nullcontext
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Sequence
+from typing import IO, Sequence
 
-try:
-    from rich.console import Console
-    from rich.panel import Panel
-    from rich.table import Table
-    from rich.text import Text
-except ImportError:
-    Console = None
-    Panel = None
-    Table = None
-    Text = None
-
-OUT_CONSOLE = Console() if Console is not None else None
-ERR_CONSOLE = Console(stderr=True) if Console is not None else None
+# rich is imported on first output (see load_rich) so `--help` and argument errors
+# don't pay for it.
+Console = None
+Panel = None
+Table = None
+Text = None
+OUT_CONSOLE = None
+ERR_CONSOLE = None
+_RICH_LOAD_LOCK = threading.Lock()
+_rich_loaded = False
 
 
 SUPPORTED_AUDIO_EXTENSIONS = {
@@ -56,10 +60,49 @@ PREDEFINED_VOICES = {
     "azelma",
 }
 
-VOICE_BASE_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+VOICE_BASE_CHARS = frozenset(string.ascii_letters + string.digits + "_")
 VOICE_SELECTOR_PATTERN = re.compile(r"^([A-Za-z0-9_]+)(?:-([1-9][0-9]*))?$")
+SLUG_INVALID_PATTERN = re.compile(r"[^a-z0-9._-]+")
+# [HH:]MM:SS[.fff]; plain seconds (no colon) go through float() instead.
+TIMECODE_PATTERN = re.compile(r"(?:(\d+):)?(\d+):(\d+(?:\.\d*)?|\.\d+)")
 START_ONLY_DEFAULT_WINDOW_SECONDS = 30.0
+COMMAND_OUTPUT_TAIL_LINES = 200
+# Optional `pocket-tts generate` options: (args attribute, CLI flag). Drives the command
+# line, the generation cache key, and the manifest "options" block.
+POCKET_TTS_OPTION_FLAGS: tuple[tuple[str, str], ...] = (
+    ("variant", "--variant"),
+    ("temperature", "--temperature"),
+    ("lsd_decode_steps", "--lsd-decode-steps"),
+    ("max_tokens", "--max-tokens"),
+    ("noise_clamp", "--noise-clamp"),
+    ("eos_threshold", "--eos-threshold"),
+    ("frames_after_eos", "--frames-after-eos"),
+)
 DEFAULT_DOWNLOAD_CACHE_DIR = Path("media") / "downloads"
+DEFAULT_TTS_CACHE_DIR = Path("media") / "tts_cache"
+DEFAULT_EMBEDDING_CACHE_DIR = Path("media") / "embedding_cache"
+DOWNLOAD_META_PATH = DEFAULT_DOWNLOAD_CACHE_DIR / ".meta.json"
+
+# Concurrent batch jobs share the voices/ tree and the download cache.
+CLONE_VERSION_LOCK = threading.Lock()
+# Embedding export and generation compete for the same cores/accelerator, so concurrent
+# jobs take turns on them while their download/trim stages overlap. run_jobs resizes
+# this to --max-concurrent-gpu-jobs.
+COMPUTE_STAGE_SLOTS = threading.Semaphore(1)
+_DOWNLOAD_LOCKS: dict[str, threading.Lock] = {}
+_DOWNLOAD_LOCKS_GUARD = threading.Lock()
+# source URL -> {"file", "mtime_ns", "size"} for media/downloads, loaded on first use.
+_download_meta: dict[str, dict] | None = None
+_download_meta_dirty = False
+_DOWNLOAD_META_LOCK = threading.Lock()
+# job fingerprint -> run_manifest.json path for --resume, stored under --output-root.
+JOB_INDEX_NAME = ".job_index.json"
+_JOB_INDEX_LOCK = threading.Lock()
+# Process-local suffix for run dir names so jobs within one clock tick never collide.
+_RUN_COUNTER = itertools.count()
+# Loaded TTSModel instances keyed by load parameters + device, reused across batch jobs.
+_MODEL_CACHE: dict[tuple, object] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
 
 
 @dataclass
@@ -86,6 +129,26 @@ class CommandFailure(Exception):
         )
 
 
+def load_rich() -> None:
+    global Console, Panel, Table, Text, OUT_CONSOLE, ERR_CONSOLE, _rich_loaded
+    if _rich_loaded:
+        return
+    with _RICH_LOAD_LOCK:
+        if _rich_loaded:
+            return
+        try:
+            from rich.console import Console
+            from rich.panel import Panel
+            from rich.table import Table
+            from rich.text import Text
+        except ImportError:
+            pass
+        else:
+            OUT_CONSOLE = Console()
+            ERR_CONSOLE = Console(stderr=True)
+        _rich_loaded = True
+
+
 def console_print(
     message: str = "",
     *,
@@ -94,6 +157,7 @@ def console_print(
     highlight: bool = False,
     end: str = "\n",
 ) -> None:
+    load_rich()
     target = ERR_CONSOLE if stderr else OUT_CONSOLE
     if target is not None:
         target.print(message, markup=markup, highlight=highlight, end=end)
@@ -103,6 +167,7 @@ def console_print(
 
 
 def log_success(message: str) -> None:
+    load_rich()
     if OUT_CONSOLE is not None:
         OUT_CONSOLE.print(message, style="bold green")
         return
@@ -110,6 +175,7 @@ def log_success(message: str) -> None:
 
 
 def log_warning(message: str) -> None:
+    load_rich()
     if ERR_CONSOLE is not None:
         ERR_CONSOLE.print(message, style="bold yellow")
         return
@@ -117,6 +183,7 @@ def log_warning(message: str) -> None:
 
 
 def log_error(message: str) -> None:
+    load_rich()
     if ERR_CONSOLE is not None:
         ERR_CONSOLE.print(message, style="bold red")
         return
@@ -124,6 +191,7 @@ def log_error(message: str) -> None:
 
 
 def print_command(cmd: Sequence[str]) -> None:
+    load_rich()
     cmd_text = shlex.join(cmd)
     if OUT_CONSOLE is not None and Text is not None:
         command_text = Text("$ ", style="bold bright_black")
@@ -136,12 +204,19 @@ def print_command(cmd: Sequence[str]) -> None:
 def step_status(args: argparse.Namespace, message: str):
     if args.verbose_command_output or args.dry_run:
         return nullcontext()
-    if OUT_CONSOLE is not None:
+    load_rich()
+    # Rich allows a single live display, so concurrent jobs fall back to plain lines.
+    if OUT_CONSOLE is not None and args.jobs_concurrency <= 1 and not args.prefetch_downloads:
         return OUT_CONSOLE.status(f"[bold cyan]{message}[/]")
-    print(message, flush=True)
+    console_print(message)
     return nullcontext()
 
 
+def download_lock(cache_stem: str) -> threading.Lock:
+    with _DOWNLOAD_LOCKS_GUARD:
+        return _DOWNLOAD_LOCKS.setdefault(cache_stem, threading.Lock())
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Download source audio (YouTube/Reddit/etc.) and run voice cloning.",
@@ -186,6 +261,42 @@ def build_parser() -> argparse.ArgumentParser:
             "<source_url> <text> [optional_run_name] [optional_voice_name]."
         ),
     )
+    parser.add_argument(
+        "--jobs-concurrency",
+        type=int,
+        default=1,
+        help=(
+            "Batch mode: number of jobs to run at once. Jobs sharing a source URL "
+            "still download it once. Default: 1"
+        ),
+    )
+    parser.add_argument(
+        "--prefetch-downloads",
+        action="store_true",
+        help=(
+            "Batch mode: download the next job's --source-url audio in the background "
+            "while the current job runs. Jobs still run one at a time."
+        ),
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=("fifo", "sjf"),
+        default="fifo",
+        help=(
+            "Batch mode: job dispatch order. fifo keeps TSV order; sjf runs the cheapest "
+            "jobs first (generate-only by text length, then clones with audio already on "
+            "disk by size, then clones that need a download). Default: fifo"
+        ),
+    )
+    parser.add_argument(
+        "--max-concurrent-gpu-jobs",
+        type=int,
+        default=1,
+        help=(
+            "Batch mode: number of jobs allowed in embedding export / pocket-tts generation "
+            "at once when --jobs-concurrency > 1. Default: 1"
+        ),
+    )
     parser.add_argument(
         "--output-root",
         type=Path,
@@ -231,6 +342,23 @@ def build_parser() -> argparse.ArgumentParser:
         type=int,
         help="Pocket TTS frames generated after EOS.",
     )
+    parser.add_argument(
+        "--in-process-generate",
+        action="store_true",
+        help=(
+            "Run generation inside this process instead of spawning `pocket-tts generate` "
+            "per job, so the model loaded for voice export is reused across every job."
+        ),
+    )
+    parser.add_argument(
+        "--encoder-autocast",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Encode the voice embedding under reduced-precision autocast "
+            "(bf16/fp16). Default: on for cuda/mps, off for cpu."
+        ),
+    )
     parser.add_argument(
         "--trim-start-seconds",
         type=float,
@@ -297,6 +425,38 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Stop after saving voice profile files (skip pocket-tts generation).",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Skip jobs that already finished with the same source, text, voice, and options "
+            f"(tracked in <output-root>/{JOB_INDEX_NAME}); useful when re-running a batch."
+        ),
+    )
+    parser.add_argument(
+        "--no-download-cache",
+        action="store_true",
+        help=(
+            "Always re-download --source-url audio instead of reusing a cached copy "
+            f"(cache: {DEFAULT_DOWNLOAD_CACHE_DIR})."
+        ),
+    )
+    parser.add_argument(
+        "--no-tts-cache",
+        action="store_true",
+        help=(
+            "Always run pocket-tts generation instead of reusing a cached output for the "
+            f"same text, voice, and generation options (cache: {DEFAULT_TTS_CACHE_DIR})."
+        ),
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help=(
+            "Always recompute voice.safetensors instead of reusing a cached embedding for "
+            f"an identical voice prompt (cache: {DEFAULT_EMBEDDING_CACHE_DIR})."
+        ),
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -329,6 +489,10 @@ def build_parser() -> argparse.ArgumentParser:
 def parse_jobs(args: argparse.Namespace) -> list[Job]:
     if args.jobs_tsv and (args.start is not None or args.end is not None):
         raise ValueError("--start/--end are currently supported only in single-job mode.")
+    if args.jobs_concurrency < 1:
+        raise ValueError("--jobs-concurrency must be at least 1.")
+    if args.max_concurrent_gpu_jobs < 1:
+        raise ValueError("--max-concurrent-gpu-jobs must be at least 1.")
 
     source_url = args.source_url
     if args.youtube_url:
@@ -406,40 +570,53 @@ def load_jobs_from_tsv(path: Path) -> list[Job]:
         raise FileNotFoundError(f"jobs TSV not found: {path}")
 
     jobs: list[Job] = []
-    with path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.reader(handle, delimiter="\t")
-        for line_number, row in enumerate(reader, start=1):
-            if not row:
-                continue
-            if row[0].strip().startswith("#"):
-                continue
-            if len(row) < 2:
-                raise ValueError(
-                    f"{path}:{line_number}: expected at least 2 columns: "
-                    "<source_url> <text> [optional_run_name] [optional_voice_name]"
-                )
+    # Plain tab splitting: the format has no quoting, and csv would treat `"` in text specially.
+    lines = path.read_text(encoding="utf-8").splitlines()
+    for line_number, line in enumerate(lines, start=1):
+        if not line:
+            continue
+        if line.lstrip().startswith("#"):
+            continue
+        row = line.split("\t")
+        if len(row) < 2:
+            raise ValueError(
+                f"{path}:{line_number}: expected at least 2 columns: "
+                "<source_url> <text> [optional_run_name] [optional_voice_name]"
+            )
 
-            source_url = row[0].strip() or None
-            text = row[1].strip() or None
-            run_name = row[2].strip() if len(row) > 2 and row[2].strip() else None
-            voice_name = row[3].strip() if len(row) > 3 and row[3].strip() else None
-
-            jobs.append(
-                Job(
-                    source_url=source_url,
-                    source_path=None,
-                    text=text,
-                    run_name=run_name,
-                    voice_name=voice_name,
-                )
+        source_url = row[0].strip() or None
+        text = row[1].strip() or None
+        run_name = row[2].strip() if len(row) > 2 and row[2].strip() else None
+        voice_name = row[3].strip() if len(row) > 3 and row[3].strip() else None
+
+        jobs.append(
+            Job(
+                source_url=source_url,
+                source_path=None,
+                text=text,
+                run_name=run_name,
+                voice_name=voice_name,
             )
+        )
 
     if not jobs:
         raise ValueError(f"No jobs found in {path}")
     return jobs
 
 
+@functools.lru_cache(maxsize=None)
+def find_tool(tool: str) -> str | None:
+    return shutil.which(tool)
+
+
+@functools.lru_cache(maxsize=None)
+def has_yt_dlp_module() -> bool:
+    return importlib.util.find_spec("yt_dlp") is not None
+
+
 def ensure_dependencies(args: argparse.Namespace, jobs: Sequence[Job]) -> None:
+    if os.environ.get("POCKET_TTS_SKIP_DEPCHECK") == "1":
+        return
     requires_source_audio = any(job.source_url or job.source_path for job in jobs)
     requires_download = any(job.source_url for job in jobs)
 
@@ -454,14 +631,14 @@ def ensure_dependencies(args: argparse.Namespace, jobs: Sequence[Job]) -> None:
             required_tools.append("pocket-tts")
     else:
         required_tools.append("uv")
-    missing = [tool for tool in required_tools if shutil.which(tool) is None]
+    missing = [tool for tool in required_tools if find_tool(tool) is None]
     if missing:
         raise RuntimeError(
             "Missing required commands: "
             + ", ".join(missing)
             + ". Install them and retry."
         )
-    if args.use_system_tools and requires_download and importlib.util.find_spec("yt_dlp") is None:
+    if args.use_system_tools and requires_download and not has_yt_dlp_module():
         # This is only a hint for mixed-Python environments.
         log_warning(
             "Warning: `yt_dlp` module is not importable from this Python. "
@@ -469,6 +646,19 @@ def ensure_dependencies(args: argparse.Namespace, jobs: Sequence[Job]) -> None:
         )
 
 
+def drain_command_stream(
+    stream: IO[str],
+    tail: deque[str],
+    forward: bool,
+    stderr: bool,
+) -> None:
+    with stream:
+        for line in stream:
+            tail.append(line)
+            if forward:
+                console_print(line, stderr=stderr, end="")
+
+
 def run_command(
     args: argparse.Namespace,
     cmd: Sequence[str],
@@ -481,31 +671,62 @@ def run_command(
     if dry_run:
         return
 
+    # Imported here (not at module top) so --help, dry runs, and fully cached jobs
+    # never load it.
+    import subprocess
+
+    # Stream both pipes instead of buffering them: verbose mode shows output live, and
+    # only the tail is kept for CommandFailure/print_failure_hints.
+    stdout_tail: deque[str] = deque(maxlen=COMMAND_OUTPUT_TAIL_LINES)
+    stderr_tail: deque[str] = deque(maxlen=COMMAND_OUTPUT_TAIL_LINES)
     status_cm = step_status(args, step_message) if step_message else nullcontext()
     with status_cm:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-
-    if args.verbose_command_output:
-        if result.stdout:
-            console_print(result.stdout, end="")
-        if result.stderr:
-            console_print(result.stderr, stderr=True, end="")
-    if result.returncode != 0:
+        # Replace undecodable bytes rather than letting a reader thread die mid-stream and
+        # silently drop the rest of the output.
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        readers = [
+            threading.Thread(
+                target=drain_command_stream,
+                args=(process.stdout, stdout_tail, args.verbose_command_output, False),
+                daemon=True,
+            ),
+            threading.Thread(
+                target=drain_command_stream,
+                args=(process.stderr, stderr_tail, args.verbose_command_output, True),
+                daemon=True,
+            ),
+        ]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        returncode = process.wait()
+
+    if returncode != 0:
         raise CommandFailure(
             cmd=cmd,
-            returncode=result.returncode,
-            stdout=result.stdout,
-            stderr=result.stderr,
+            returncode=returncode,
+            stdout="".join(stdout_tail),
+            stderr="".join(stderr_tail),
         )
 
 
 def sanitize_slug(value: str) -> str:
     value = value.strip().lower()
-    value = re.sub(r"[^a-z0-9._-]+", "-", value)
+    value = SLUG_INVALID_PATTERN.sub("-", value)
     value = value.strip("-._")
     return value or "job"
 
 
+@functools.lru_cache(maxsize=256)
 def validate_clone_voice_name(voice_name: str) -> str:
     raw = voice_name.strip()
     if "-" in raw:
@@ -514,7 +735,7 @@ def validate_clone_voice_name(voice_name: str) -> str:
             "`--voice goofy` when creating a clone. To select a version at generation "
             "time, use `--voice goofy-1`, `--voice goofy-2`, etc."
         )
-    if not VOICE_BASE_PATTERN.fullmatch(raw):
+    if not raw or not VOICE_BASE_CHARS.issuperset(raw):
         raise ValueError(
             "Clone voice names must match [A-Za-z0-9_]+. "
             "Example: `--voice goofy_voice`."
@@ -532,6 +753,7 @@ def validate_source_file(path: Path) -> None:
         )
 
 
+@functools.lru_cache(maxsize=256)
 def parse_voice_selector(selector: str) -> tuple[str, int]:
     match = VOICE_SELECTOR_PATTERN.fullmatch(selector.strip())
     if not match:
@@ -560,29 +782,24 @@ def parse_timecode_to_seconds(value: str) -> float:
             raise ValueError(f"Invalid time value {value!r}. Time cannot be negative.")
         return seconds
 
-    parts = raw.split(":")
-    if len(parts) not in (2, 3):
+    match = TIMECODE_PATTERN.fullmatch(raw)
+    if match is None:
+        if raw.count(":") > 2:
+            raise ValueError(
+                f"Invalid time value {value!r}. Use MM:SS or HH:MM:SS."
+            )
+        if "-" in raw:
+            raise ValueError(f"Invalid time value {value!r}. Time cannot be negative.")
         raise ValueError(
-            f"Invalid time value {value!r}. Use MM:SS or HH:MM:SS."
+            f"Invalid time value {value!r}. Use MM:SS or HH:MM:SS with numeric fields."
         )
 
-    try:
-        if len(parts) == 2:
-            minutes = int(parts[0])
-            seconds = float(parts[1])
-            hours = 0
-        else:
-            hours = int(parts[0])
-            minutes = int(parts[1])
-            seconds = float(parts[2])
-    except ValueError as error:
-        raise ValueError(
-            f"Invalid time value {value!r}. Use MM:SS or HH:MM:SS with numeric fields."
-        ) from error
+    hours_raw, minutes_raw, seconds_raw = match.groups()
+    hours = int(hours_raw) if hours_raw is not None else 0
+    minutes = int(minutes_raw)
+    seconds = float(seconds_raw)
 
-    if hours < 0 or minutes < 0 or seconds < 0:
-        raise ValueError(f"Invalid time value {value!r}. Time cannot be negative.")
-    if minutes >= 60 and len(parts) == 3:
+    if minutes >= 60 and hours_raw is not None:
         raise ValueError(
             f"Invalid time value {value!r}. In HH:MM:SS format, MM must be < 60."
         )
@@ -595,8 +812,27 @@ def parse_timecode_to_seconds(value: str) -> float:
 
 
 def resolve_prompt_window(args: argparse.Namespace) -> tuple[float, float | None]:
-    using_time_window = args.start is not None or args.end is not None
-    using_trim_window = args.trim_start_seconds > 0 or args.trim_duration_seconds is not None
+    # Validation, ffmpeg/in-process trimming, and every manifest need this; the inputs
+    # are the same for every job in a run, so the timecodes are parsed once.
+    return _resolve_prompt_window(
+        args.start,
+        args.end,
+        args.trim_start_seconds,
+        args.trim_duration_seconds,
+        args.auto_truncate_seconds,
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _resolve_prompt_window(
+    start: str | None,
+    end: str | None,
+    trim_start_seconds: float,
+    trim_duration_seconds: float | None,
+    auto_truncate_seconds: float,
+) -> tuple[float, float | None]:
+    using_time_window = start is not None or end is not None
+    using_trim_window = trim_start_seconds > 0 or trim_duration_seconds is not None
 
     if using_time_window and using_trim_window:
         raise ValueError(
@@ -604,53 +840,80 @@ def resolve_prompt_window(args: argparse.Namespace) -> tuple[float, float | None
         )
 
     if using_time_window:
-        start_seconds = parse_timecode_to_seconds(args.start) if args.start else 0.0
-        if args.end:
-            end_seconds = parse_timecode_to_seconds(args.end)
+        start_seconds = parse_timecode_to_seconds(start) if start else 0.0
+        if end:
+            end_seconds = parse_timecode_to_seconds(end)
             if end_seconds <= start_seconds:
                 raise ValueError(
-                    f"Invalid clip window: --end ({args.end}) must be greater than "
-                    f"--start ({args.start or '0'})."
+                    f"Invalid clip window: --end ({end}) must be greater than "
+                    f"--start ({start or '0'})."
                 )
             return start_seconds, end_seconds - start_seconds
-        if args.start:
+        if start:
             return start_seconds, START_ONLY_DEFAULT_WINDOW_SECONDS
         return start_seconds, None
 
-    prompt_duration = args.trim_duration_seconds
-    if prompt_duration is None and args.auto_truncate_seconds > 0:
-        prompt_duration = args.auto_truncate_seconds
-    return args.trim_start_seconds, prompt_duration
+    prompt_duration = trim_duration_seconds
+    if prompt_duration is None and auto_truncate_seconds > 0:
+        prompt_duration = auto_truncate_seconds
+    return trim_start_seconds, prompt_duration
 
 
+@functools.lru_cache(maxsize=256)
 def clone_version_dir(output_root: Path, voice_base: str, version: int) -> Path:
     return output_root / voice_base / str(version)
 
 
-def next_clone_version(output_root: Path, voice_base: str) -> int:
+def _scan_versions(base_dir: str) -> tuple[int, ...]:
+    with os.scandir(base_dir) as entries:
+        return tuple(
+            sorted(
+                int(entry.name)
+                for entry in entries
+                if entry.name.isdigit() and entry.is_dir(follow_symlinks=False)
+            )
+        )
+
+
+@functools.lru_cache(maxsize=256)
+def _scan_versions_cached(base_dir: str, mtime_ns: int) -> tuple[int, ...]:
+    # mtime_ns is only part of the key: creating or removing a version dir bumps it.
+    return _scan_versions(base_dir)
+
+
+def scan_clone_versions(output_root: Path, voice_base: str) -> tuple[int, ...]:
     base_dir = output_root / voice_base
-    max_version = 0
-    if base_dir.exists():
-        for path in base_dir.iterdir():
-            if path.is_dir() and path.name.isdigit():
-                max_version = max(max_version, int(path.name))
-    return max_version + 1
+    try:
+        mtime_ns = base_dir.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ()
+    return _scan_versions_cached(str(base_dir), mtime_ns)
+
+
+def next_clone_version(output_root: Path, voice_base: str) -> int:
+    # Always a fresh scan: on filesystems with coarse timestamps (HFS+, FAT, older ext4)
+    # two version dirs created within one tick leave the parent mtime unchanged, and a
+    # memoized scan would hand concurrent clone jobs the same number.
+    try:
+        versions = _scan_versions(str(output_root / voice_base))
+    except FileNotFoundError:
+        return 1
+    return max(versions, default=0) + 1
 
 
 def available_clone_versions(output_root: Path, voice_base: str) -> list[int]:
-    base_dir = output_root / voice_base
-    versions: list[int] = []
-    if base_dir.exists():
-        for path in base_dir.iterdir():
-            if path.is_dir() and path.name.isdigit():
-                versions.append(int(path.name))
-    return sorted(versions)
+    return list(scan_clone_versions(output_root, voice_base))
 
 
 def generation_run_dir(
     output_root: Path, voice_base: str, version: int, run_name: str | None
 ) -> Path:
-    timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    now_ns = time.time_ns()
+    seconds, fraction_ns = divmod(now_ns, 1_000_000_000)
+    timestamp = (
+        f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(seconds))}"
+        f"_{fraction_ns:09d}_{next(_RUN_COUNTER):04d}"
+    )
     leaf = f"{sanitize_slug(run_name)}_{timestamp}" if run_name else timestamp
     return clone_version_dir(output_root, voice_base, version) / "runs" / leaf
 
@@ -668,7 +931,9 @@ def print_job_header(
         mode = "file->voice"
     else:
         mode = "source->voice" if job.source_url else "voice->tts"
-    if OUT_CONSOLE is not None and Panel is not None and Table is not None:
+    load_rich()
+    # Piped/CI output gets the plain lines; building panels only to strip their styling is wasted work.
+    if OUT_CONSOLE is not None and OUT_CONSOLE.is_terminal and Panel is not None and Table is not None:
         details = Table.grid(padding=(0, 1))
         details.add_row("[bold bright_magenta]Job[/]", f"[bold]{ordinal}/{total}[/]")
         details.add_row("[bold bright_magenta]Mode[/]", f"[bold cyan]{mode}[/]")
@@ -695,24 +960,26 @@ def print_job_header(
         )
         return
 
-    print("\n" + "=" * 80, flush=True)
-    print(f"Job {ordinal}/{total}", flush=True)
-    print(f"Mode: {mode}", flush=True)
+    # Build the block first: one write + flush per header, and concurrent jobs can't
+    # interleave inside it.
+    lines = ["", "=" * 80, f"Job {ordinal}/{total}", f"Mode: {mode}"]
     if job.source_url:
-        print(f"Source URL: {job.source_url}", flush=True)
+        lines.append(f"Source URL: {job.source_url}")
     if job.source_path:
-        print(f"Source file: {job.source_path}", flush=True)
-    print(f"Voice profile: {voice_profile_name}/{voice_profile_version}", flush=True)
+        lines.append(f"Source file: {job.source_path}")
+    lines.append(f"Voice profile: {voice_profile_name}/{voice_profile_version}")
     if generation_dir is not None and generation_dir != run_dir:
-        print(f"Clone dir: {run_dir}", flush=True)
-        print(f"Generation dir: {generation_dir}", flush=True)
+        lines.append(f"Clone dir: {run_dir}")
+        lines.append(f"Generation dir: {generation_dir}")
     else:
-        print(f"Output dir: {run_dir}", flush=True)
-    print("=" * 80, flush=True)
+        lines.append(f"Output dir: {run_dir}")
+    lines.append("=" * 80)
+    print("\n".join(lines), flush=True)
 
 
 def print_completion_summary(completed: Sequence[Path]) -> None:
-    if OUT_CONSOLE is not None and Panel is not None and Table is not None:
+    load_rich()
+    if OUT_CONSOLE is not None and OUT_CONSOLE.is_terminal and Panel is not None and Table is not None:
         details = Table.grid(padding=(0, 1))
         for path in completed:
             details.add_row("[green]-[/]", f"[bold green]{path}[/]")
@@ -726,9 +993,9 @@ def print_completion_summary(completed: Sequence[Path]) -> None:
         )
         return
 
-    print("\nAll jobs completed.", flush=True)
-    for path in completed:
-        print(f"- {path}", flush=True)
+    lines = ["", "All jobs completed."]
+    lines.extend(f"- {path}" for path in completed)
+    print("\n".join(lines), flush=True)
 
 
 def download_cache_stem(source_url: str) -> str:
@@ -741,18 +1008,140 @@ def legacy_youtube_cache_stem(source_url: str) -> str:
     return f"youtube_{cache_key}"
 
 
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tts_cache_key(args: argparse.Namespace, text: str, voice_reference: str | Path) -> str:
+    if isinstance(voice_reference, Path):
+        voice_key = f"file:{file_sha256(voice_reference)}"
+    else:
+        voice_key = f"builtin:{voice_reference}"
+    payload = {
+        "text": text,
+        "voice": voice_key,
+        "device": args.device,
+        **{name: getattr(args, name) for name, _flag in POCKET_TTS_OPTION_FLAGS},
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def embedding_cache_key(args: argparse.Namespace, voice_prompt_wav: Path) -> str:
+    # Only inputs to the audio encoder matter; generation options don't change the embedding.
+    payload = {
+        "prompt": file_sha256(voice_prompt_wav),
+        "device": args.device,
+        "variant": args.variant,
+        "auto_truncate_seconds": args.auto_truncate_seconds,
+        "encoder_autocast": args.encoder_autocast,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def materialize_file(source: Path, destination: Path) -> None:
+    """Hardlink source to destination, copying instead when linking isn't possible.
+
+    Cache entries and run artifacts are written once and never edited in place, so
+    sharing an inode is safe and skips copying large WAVs.
+    """
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        if os.path.samefile(source, destination):
+            return
+        # Writing into the existing file could change a cache entry it is linked to.
+        destination.unlink()
+        materialize_file(source, destination)
+    except OSError:
+        # Cross-device (EXDEV) or a filesystem without hardlink support.
+        shutil.copyfile(source, destination)
+
+
+def clone_file(source: Path, destination: Path) -> None:
+    """Copy source to a new destination as a copy-on-write reflink when possible.
+
+    Reflinks (Btrfs, XFS, bcachefs) share no inode, so either file can change later;
+    elsewhere this falls back to materialize_file's hardlink-or-copy.
+    """
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        # Replace rather than truncate: an existing destination may be a hardlink.
+        destination.unlink(missing_ok=True)
+        try:
+            with source.open("rb") as src, destination.open("xb") as dst:
+                fcntl.ioctl(dst.fileno(), getattr(fcntl, "FICLONE", 0x40049409), src.fileno())
+        except OSError:
+            destination.unlink(missing_ok=True)
+        else:
+            shutil.copystat(source, destination)
+            return
+    materialize_file(source, destination)
+
+
+def store_in_cache(source: Path, cache_path: Path) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}.tmp")
+    materialize_file(source, tmp_path)
+    tmp_path.replace(cache_path)
+
+
+def _scan_audio_files_by_stem(search_dir: str) -> dict[str, tuple[Path, ...]]:
+    """One scandir of search_dir, grouping supported audio files under every stem that
+    `<stem>.*` would glob them by."""
+    grouped: dict[str, list[Path]] = {}
+    with os.scandir(search_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if os.path.splitext(name)[1].lower() not in SUPPORTED_AUDIO_EXTENSIONS:
+                continue
+            if not entry.is_file():
+                continue
+            path = Path(entry.path)
+            dot = name.find(".")
+            while dot != -1:
+                grouped.setdefault(name[:dot], []).append(path)
+                dot = name.find(".", dot + 1)
+    return {stem: tuple(sorted(paths)) for stem, paths in grouped.items()}
+
+
+@functools.lru_cache(maxsize=16)
+def _audio_files_by_stem(search_dir: str, mtime_ns: int) -> dict[str, tuple[Path, ...]]:
+    """Memoized _scan_audio_files_by_stem; mtime_ns is only part of the cache key."""
+    return _scan_audio_files_by_stem(search_dir)
+
+
 def find_downloaded_audio(
     search_dir: Path,
     stem: str = "source",
     *,
     required: bool = True,
+    fresh: bool = False,
 ) -> Path | None:
+    """Return the first supported audio file matching `<stem>.*` in search_dir.
+
+    Pass fresh=True right after writing into search_dir: a coarse-timestamp filesystem
+    can leave its mtime unchanged, so the memoized scan would miss the new file.
+    """
     pattern = f"{stem}.*"
-    candidates = sorted(
-        p
-        for p in search_dir.glob(pattern)
-        if p.is_file() and p.suffix.lower() in SUPPORTED_AUDIO_EXTENSIONS
-    )
+    try:
+        if fresh:
+            # Drop memoized scans too, so later cached lookups can't reuse a stale one.
+            _audio_files_by_stem.cache_clear()
+            candidates = _scan_audio_files_by_stem(str(search_dir)).get(stem, ())
+        else:
+            # Lookups for the current and legacy stems share one directory scan until
+            # a download lands in search_dir and bumps its mtime.
+            mtime_ns = search_dir.stat().st_mtime_ns
+            candidates = _audio_files_by_stem(str(search_dir), mtime_ns).get(stem, ())
+    except FileNotFoundError:
+        candidates = ()
     if not candidates:
         if required:
             raise FileNotFoundError(
@@ -762,10 +1151,162 @@ def find_downloaded_audio(
     return candidates[0]
 
 
+def _loaded_download_meta() -> dict[str, dict]:
+    global _download_meta
+    if _download_meta is None:
+        try:
+            loaded = json.loads(DOWNLOAD_META_PATH.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            loaded = None
+        # The index is safe to delete or hand-edit; anything but an object starts it afresh.
+        _download_meta = loaded if isinstance(loaded, dict) else {}
+    return _download_meta
+
+
+def remember_download(source_url: str, audio_path: Path) -> None:
+    global _download_meta_dirty
+    stat = audio_path.stat()
+    with _DOWNLOAD_META_LOCK:
+        _loaded_download_meta()[source_url.strip()] = {
+            "file": audio_path.name,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+        _download_meta_dirty = True
+
+
+def find_cached_download(source_url: str) -> Path | None:
+    """Return the cached, non-empty download for source_url, or None.
+
+    Checks the metadata index first (one stat) and only globs media/downloads for the
+    current and legacy stems on a miss or a stale entry.
+    """
+    global _download_meta_dirty
+    with _DOWNLOAD_META_LOCK:
+        entry = _loaded_download_meta().get(source_url.strip())
+    if entry is not None:
+        # A malformed entry is treated like a stale one: dropped, then the cache is globbed.
+        file_name = entry.get("file") if isinstance(entry, dict) else None
+        mtime_ns = entry.get("mtime_ns") if isinstance(entry, dict) else None
+        stat = None
+        if isinstance(file_name, str) and file_name:
+            candidate = DEFAULT_DOWNLOAD_CACHE_DIR / file_name
+            try:
+                stat = candidate.stat()
+            except OSError:
+                stat = None
+        if stat is not None and stat.st_mtime_ns == mtime_ns and stat.st_size > 0:
+            return candidate
+        with _DOWNLOAD_META_LOCK:
+            _loaded_download_meta().pop(source_url.strip(), None)
+            _download_meta_dirty = True
+
+    for stem in (download_cache_stem(source_url), legacy_youtube_cache_stem(source_url)):
+        candidate = find_downloaded_audio(DEFAULT_DOWNLOAD_CACHE_DIR, stem=stem, required=False)
+        if candidate is None:
+            continue
+        if candidate.stat().st_size == 0:
+            # An interrupted download can leave an empty file behind; fetch again.
+            return None
+        remember_download(source_url, candidate)
+        return candidate
+    return None
+
+
+def save_download_meta() -> None:
+    with _DOWNLOAD_META_LOCK:
+        if not _download_meta_dirty or _download_meta is None:
+            return
+        DOWNLOAD_META_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = DOWNLOAD_META_PATH.with_name(f"{DOWNLOAD_META_PATH.name}.tmp")
+        tmp_path.write_text(json.dumps(_download_meta, indent=2) + "\n", encoding="utf-8")
+        tmp_path.replace(DOWNLOAD_META_PATH)
+
+
+@functools.lru_cache(maxsize=256)
 def voice_profile_paths_for_clone_dir(clone_dir: Path) -> tuple[Path, Path]:
     return clone_dir / "voice.wav", clone_dir / "voice.safetensors"
 
 
+def load_tts_model(args: argparse.Namespace):
+    """Return a TTSModel for args' model options and device, loading it on first use."""
+    try:
+        from pocket_tts import TTSModel
+        from pocket_tts.default_parameters import (
+            DEFAULT_EOS_THRESHOLD,
+            DEFAULT_LSD_DECODE_STEPS,
+            DEFAULT_NOISE_CLAMP,
+            DEFAULT_TEMPERATURE,
+            DEFAULT_VARIANT,
+        )
+    except ImportError as error:
+        raise RuntimeError(
+            "Failed to import pocket-tts. Run this script with `uv run ...` after `uv sync`."
+        ) from error
+
+    variant = args.variant or DEFAULT_VARIANT
+    temperature = args.temperature if args.temperature is not None else DEFAULT_TEMPERATURE
+    lsd_decode_steps = (
+        args.lsd_decode_steps
+        if args.lsd_decode_steps is not None
+        else DEFAULT_LSD_DECODE_STEPS
+    )
+    noise_clamp = args.noise_clamp if args.noise_clamp is not None else DEFAULT_NOISE_CLAMP
+    eos_threshold = args.eos_threshold if args.eos_threshold is not None else DEFAULT_EOS_THRESHOLD
+
+    model_key = (variant, temperature, lsd_decode_steps, noise_clamp, eos_threshold, args.device)
+    with _MODEL_CACHE_LOCK:
+        tts_model = _MODEL_CACHE.get(model_key)
+        if tts_model is None:
+            tts_model = TTSModel.load_model(
+                variant=variant,
+                temp=temperature,
+                lsd_decode_steps=lsd_decode_steps,
+                noise_clamp=noise_clamp,
+                eos_threshold=eos_threshold,
+            )
+            tts_model.to(args.device)
+            _MODEL_CACHE[model_key] = tts_model
+    return tts_model
+
+
+def generate_in_process(
+    args: argparse.Namespace,
+    text: str,
+    voice_reference: str | Path,
+    output_wav: Path,
+) -> None:
+    """Same as `pocket-tts generate`, but on the cached in-process model (--in-process-generate)."""
+    if args.verbose_command_output or args.dry_run:
+        print_command(["generate-in-process", "--voice", str(voice_reference), str(output_wav)])
+    if args.dry_run:
+        return
+
+    try:
+        from pocket_tts.data.audio import stream_audio_chunks
+        from pocket_tts.default_parameters import MAX_TOKEN_PER_CHUNK
+    except ImportError as error:
+        raise RuntimeError(
+            "Failed to import pocket-tts for in-process generation. "
+            "Run this script with `uv run ...` after `uv sync`."
+        ) from error
+
+    if "cuda" in args.device:
+        # Matches `pocket-tts generate`: CUDA graph capture doesn't mix with its decode thread.
+        os.environ["NO_CUDA_GRAPH"] = "1"
+
+    with step_status(args, "Generating cloned snippet..."):
+        tts_model = load_tts_model(args)
+        model_state = tts_model.get_state_for_audio_prompt(voice_reference)
+        audio_chunks = tts_model.generate_audio_stream(
+            model_state=model_state,
+            text_to_generate=text,
+            frames_after_eos=args.frames_after_eos,
+            max_tokens=args.max_tokens if args.max_tokens is not None else MAX_TOKEN_PER_CHUNK,
+        )
+        stream_audio_chunks(output_wav, audio_chunks, tts_model.config.mimi.sample_rate)
+
+
 def export_voice_safetensors(
     args: argparse.Namespace,
     voice_prompt_wav: Path,
@@ -776,19 +1317,24 @@ def export_voice_safetensors(
     if args.dry_run:
         return
 
+    embedding_cache_path: Path | None = None
+    if not args.no_embedding_cache:
+        embedding_cache_path = (
+            DEFAULT_EMBEDDING_CACHE_DIR
+            / f"{embedding_cache_key(args, voice_prompt_wav)}.safetensors"
+        )
+        if embedding_cache_path.exists():
+            # Skips the torch import, model load, and encoder forward pass entirely.
+            output_safetensors.parent.mkdir(parents=True, exist_ok=True)
+            materialize_file(embedding_cache_path, output_safetensors)
+            log_success(f"Reusing cached voice embedding: {embedding_cache_path}")
+            return
+
     try:
         import safetensors.torch
         import torch
-        from pocket_tts import TTSModel
         from pocket_tts.data.audio import audio_read
         from pocket_tts.data.audio_utils import convert_audio
-        from pocket_tts.default_parameters import (
-            DEFAULT_EOS_THRESHOLD,
-            DEFAULT_LSD_DECODE_STEPS,
-            DEFAULT_NOISE_CLAMP,
-            DEFAULT_TEMPERATURE,
-            DEFAULT_VARIANT,
-        )
     except ImportError as error:
         raise RuntimeError(
             "Failed to import pocket-tts/safetensors for voice export. "
@@ -796,24 +1342,7 @@ def export_voice_safetensors(
         ) from error
 
     with step_status(args, "Exporting voice embedding..."):
-        variant = args.variant or DEFAULT_VARIANT
-        temperature = args.temperature if args.temperature is not None else DEFAULT_TEMPERATURE
-        lsd_decode_steps = (
-            args.lsd_decode_steps
-            if args.lsd_decode_steps is not None
-            else DEFAULT_LSD_DECODE_STEPS
-        )
-        noise_clamp = args.noise_clamp if args.noise_clamp is not None else DEFAULT_NOISE_CLAMP
-        eos_threshold = args.eos_threshold if args.eos_threshold is not None else DEFAULT_EOS_THRESHOLD
-
-        tts_model = TTSModel.load_model(
-            variant=variant,
-            temp=temperature,
-            lsd_decode_steps=lsd_decode_steps,
-            noise_clamp=noise_clamp,
-            eos_threshold=eos_threshold,
-        )
-        tts_model.to(args.device)
+        tts_model = load_tts_model(args)
 
         audio, sample_rate = audio_read(voice_prompt_wav)
         if args.auto_truncate_seconds > 0:
@@ -821,12 +1350,132 @@ def export_voice_safetensors(
             if audio.shape[-1] > max_samples:
                 audio = audio[..., :max_samples]
 
-        audio_conditioning = convert_audio(audio, sample_rate, tts_model.sample_rate, 1)
-        with torch.no_grad():
-            prompt = tts_model._encode_audio(audio_conditioning.unsqueeze(0).to(tts_model.device))
+        # pocket-tts resamples with scipy on the CPU, so keep the waveform on the host until
+        # it is at the model rate; prompts written at --prompt-sample-rate 24000 (the default)
+        # already are, so they skip conversion and cross to the device exactly once.
+        if sample_rate != tts_model.sample_rate:
+            audio = convert_audio(audio, sample_rate, tts_model.sample_rate, 1)
+        # tts_model.device may be a torch.device or an indexed string like "cuda:0";
+        # autocast and the checks below want the bare type name.
+        device_type = torch.device(tts_model.device).type
+        if device_type == "cuda":
+            # A pinned host buffer lets the copy below run as an async DMA transfer.
+            audio = audio.contiguous().pin_memory()
+        use_autocast = (
+            args.encoder_autocast
+            if args.encoder_autocast is not None
+            else device_type in ("cuda", "mps")
+        )
+        if device_type == "mps" or (device_type == "cuda" and not torch.cuda.is_bf16_supported()):
+            autocast_dtype = torch.float16
+        else:
+            autocast_dtype = torch.bfloat16
+        with torch.no_grad(), torch.autocast(
+            device_type=device_type,
+            dtype=autocast_dtype,
+            enabled=use_autocast,
+        ):
+            prompt = tts_model._encode_audio(
+                audio.unsqueeze(0).to(tts_model.device, non_blocking=True)
+            )
+        # Saved embeddings stay fp32 so they load the same on every device. The .cpu()
+        # copy at save time waits for the device, so no explicit synchronize is needed.
+        prompt = prompt.to(torch.float32)
 
         output_safetensors.parent.mkdir(parents=True, exist_ok=True)
         safetensors.torch.save_file({"audio_prompt": prompt.cpu()}, str(output_safetensors))
+    if embedding_cache_path is not None:
+        store_in_cache(output_safetensors, embedding_cache_path)
+
+
+def trim_prompt_in_process(
+    source_audio: Path,
+    voice_prompt_wav: Path,
+    start_seconds: float,
+    duration_seconds: float | None,
+    target_sample_rate: int,
+) -> bool:
+    """Cut, downmix, and resample a WAV source without spawning ffmpeg.
+
+    Returns False when the source can't be handled here so the caller can fall back
+    to ffmpeg.
+    """
+    try:
+        import numpy as np
+        from scipy.io import wavfile
+        from scipy.signal import resample_poly
+    except ImportError:
+        return False
+
+    try:
+        sample_rate, data = wavfile.read(source_audio, mmap=True)
+    except (ValueError, OSError):
+        return False
+
+    start_frame = int(round(start_seconds * sample_rate))
+    stop_frame = (
+        start_frame + int(round(duration_seconds * sample_rate))
+        if duration_seconds is not None
+        else None
+    )
+    clip = data[start_frame:stop_frame]
+    if clip.size == 0:
+        # E.g. a trim start past the end of the file; let ffmpeg fail with its own error
+        # instead of writing an empty prompt that only breaks later during export.
+        return False
+
+    if clip.dtype == np.uint8:
+        samples = (clip.astype(np.float32) - 128.0) / 128.0
+    elif np.issubdtype(clip.dtype, np.integer):
+        samples = clip.astype(np.float32) / float(-np.iinfo(clip.dtype).min)
+    else:
+        samples = clip.astype(np.float32)
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+
+    if sample_rate != target_sample_rate and samples.size:
+        factor = math.gcd(sample_rate, target_sample_rate)
+        samples = resample_poly(samples, target_sample_rate // factor, sample_rate // factor)
+
+    # Match ffmpeg's default .wav output: 16-bit PCM.
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+    wavfile.write(voice_prompt_wav, target_sample_rate, pcm)
+    return True
+
+
+def extract_voice_prompt(
+    args: argparse.Namespace, source_audio: Path, voice_prompt_wav: Path
+) -> None:
+    if source_audio.suffix.lower() == ".wav":
+        start_seconds, prompt_duration = resolve_prompt_window(args)
+        if args.verbose_command_output or args.dry_run:
+            duration_text = f"{prompt_duration}s" if prompt_duration is not None else "to-end"
+            console_print(
+                f"in-process trim: start={start_seconds}s duration={duration_text} "
+                f"sr={args.prompt_sample_rate} {source_audio} -> {voice_prompt_wav}"
+            )
+        if args.dry_run:
+            return
+        with step_status(args, "Extracting voice prompt clip..."):
+            trimmed = trim_prompt_in_process(
+                source_audio,
+                voice_prompt_wav,
+                start_seconds,
+                prompt_duration,
+                args.prompt_sample_rate,
+            )
+        if trimmed:
+            return
+        if args.verbose_command_output:
+            # run_command echoes the ffmpeg command that actually runs.
+            console_print("in-process trim unavailable for this WAV; falling back to ffmpeg")
+
+    run_command(
+        args,
+        build_ffmpeg_command(args, source_audio, voice_prompt_wav),
+        dry_run=args.dry_run,
+        step_message="Extracting voice prompt clip...",
+    )
 
 
 def tool_prefix(args: argparse.Namespace) -> list[str]:
@@ -856,6 +1505,8 @@ def build_yt_dlp_command(
     ]
     if args.force_ipv4:
         cmd.append("--force-ipv4")
+    if args.no_download_cache:
+        cmd.append("--force-overwrites")
     if args.cookies_from_browser:
         cmd.extend(["--cookies-from-browser", args.cookies_from_browser])
     if args.cookies_file:
@@ -916,25 +1567,14 @@ def build_pocket_tts_command(
     ]
     if not args.verbose_command_output:
         cmd.append("--quiet")
-    if args.variant:
-        cmd.extend(["--variant", args.variant])
-    if args.temperature is not None:
-        cmd.extend(["--temperature", str(args.temperature)])
-    if args.lsd_decode_steps is not None:
-        cmd.extend(["--lsd-decode-steps", str(args.lsd_decode_steps)])
-    if args.max_tokens is not None:
-        cmd.extend(["--max-tokens", str(args.max_tokens)])
-    if args.noise_clamp is not None:
-        cmd.extend(["--noise-clamp", str(args.noise_clamp)])
-    if args.eos_threshold is not None:
-        cmd.extend(["--eos-threshold", str(args.eos_threshold)])
-    if args.frames_after_eos is not None:
-        cmd.extend(["--frames-after-eos", str(args.frames_after_eos)])
+    for name, flag in POCKET_TTS_OPTION_FLAGS:
+        value = getattr(args, name)
+        if value is not None:
+            cmd.extend((flag, str(value)))
     return cmd
 
 
-def write_manifest(
-    run_dir: Path,
+def build_manifest(
     job: Job,
     source_audio: Path | None,
     voice_prompt_wav: Path | None,
@@ -945,37 +1585,29 @@ def write_manifest(
     voice_reference: str | Path | None,
     output_wav: Path | None,
     args: argparse.Namespace,
-) -> None:
+) -> dict:
     clip_start_seconds, clip_duration_seconds = resolve_prompt_window(args)
 
-    manifest = {
+    return {
         "created_at": dt.datetime.now().isoformat(timespec="seconds"),
         "source_url": job.source_url,
-        "source_path": str(job.source_path) if job.source_path else None,
+        "source_path": job.source_path,
         "text": job.text,
         "run_name": job.run_name,
         "voice_profile_name": voice_profile_name,
         "voice_profile_version": voice_profile_version,
         "artifacts": {
-            "source_audio": str(source_audio) if source_audio else None,
-            "voice_prompt_wav": str(voice_prompt_wav) if voice_prompt_wav else None,
-            "voice_profile_wav": str(voice_profile_wav) if voice_profile_wav else None,
-            "voice_profile_safetensors": (
-                str(voice_profile_safetensors) if voice_profile_safetensors else None
-            ),
-            "voice_reference_used": str(voice_reference) if voice_reference else None,
-            "cloned_output_wav": str(output_wav) if output_wav else None,
+            "source_audio": source_audio,
+            "voice_prompt_wav": voice_prompt_wav,
+            "voice_profile_wav": voice_profile_wav,
+            "voice_profile_safetensors": voice_profile_safetensors,
+            "voice_reference_used": voice_reference or None,
+            "cloned_output_wav": output_wav,
         },
         "options": {
             "voice": args.voice,
             "device": args.device,
-            "variant": args.variant,
-            "temperature": args.temperature,
-            "lsd_decode_steps": args.lsd_decode_steps,
-            "max_tokens": args.max_tokens,
-            "noise_clamp": args.noise_clamp,
-            "eos_threshold": args.eos_threshold,
-            "frames_after_eos": args.frames_after_eos,
+            **{name: getattr(args, name) for name, _flag in POCKET_TTS_OPTION_FLAGS},
             "trim_start_seconds": args.trim_start_seconds,
             "trim_duration_seconds": args.trim_duration_seconds,
             "start": args.start,
@@ -985,24 +1617,141 @@ def write_manifest(
             "auto_truncate_seconds": args.auto_truncate_seconds,
             "prompt_sample_rate": args.prompt_sample_rate,
             "cookies_from_browser": args.cookies_from_browser,
-            "cookies_file": str(args.cookies_file) if args.cookies_file else None,
+            "cookies_file": args.cookies_file,
             "force_ipv4": args.force_ipv4,
             "skip_generate": args.skip_generate,
         },
     }
-    with (run_dir / "run_manifest.json").open("w", encoding="utf-8") as handle:
-        json.dump(manifest, handle, indent=2)
-        handle.write("\n")
+
+
+def write_manifest(run_dirs: Sequence[Path], manifest: dict) -> None:
+    """Serialize manifest once and write it to run_manifest.json in each of run_dirs."""
+    # Path values serialize through default=str. json.dumps builds the text in one pass;
+    # json.dump with indent issues a write() per token.
+    data = (json.dumps(manifest, indent=2, default=str) + "\n").encode("utf-8")
+    for run_dir in run_dirs:
+        manifest_path = run_dir / "run_manifest.json"
+        tmp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(data)
+            handle.flush()
+            # Flush to disk before the rename so a crash leaves the old file or the new one.
+            os.fsync(handle.fileno())
+        tmp_path.replace(manifest_path)
+
+
+def job_fingerprint(args: argparse.Namespace, job: Job) -> str:
+    """Hash of everything that determines a job's outputs, for --resume."""
+    source_stat = None
+    if job.source_path:
+        stat = job.source_path.stat()
+        source_stat = [stat.st_size, stat.st_mtime_ns]
+    payload = {
+        "source_url": job.source_url,
+        "source_path": str(job.source_path) if job.source_path else None,
+        "source_stat": source_stat,
+        "text": job.text,
+        "run_name": job.run_name,
+        "voice_name": job.voice_name,
+        "device": args.device,
+        **{name: getattr(args, name) for name, _flag in POCKET_TTS_OPTION_FLAGS},
+        "prompt_window": resolve_prompt_window(args),
+        "prompt_sample_rate": args.prompt_sample_rate,
+        "skip_generate": args.skip_generate,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def load_job_index(output_root: Path) -> dict[str, str]:
+    try:
+        index = json.loads((output_root / JOB_INDEX_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    # A hand-edited or foreign index just means every job re-runs.
+    return index if isinstance(index, dict) else {}
+
+
+def find_completed_job(args: argparse.Namespace, fingerprint: str) -> Path | None:
+    """Return the run dir of a finished job with this fingerprint, if its outputs still exist."""
+    with _JOB_INDEX_LOCK:
+        manifest_path = load_job_index(args.output_root).get(fingerprint)
+    if not isinstance(manifest_path, str) or not manifest_path:
+        return None
+    try:
+        manifest = json.loads(Path(manifest_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict):
+        return None
+    artifacts = manifest.get("artifacts")
+    if not isinstance(artifacts, dict):
+        return None
+    output = artifacts.get("cloned_output_wav") or artifacts.get("voice_profile_safetensors")
+    if not isinstance(output, str) or not output or not Path(output).exists():
+        return None
+    return Path(manifest_path).parent
+
+
+def record_completed_job(args: argparse.Namespace, fingerprint: str, run_dir: Path) -> None:
+    index_path = args.output_root / JOB_INDEX_NAME
+    with _JOB_INDEX_LOCK:
+        index = load_job_index(args.output_root)
+        index[fingerprint] = str(run_dir / "run_manifest.json")
+        tmp_path = index_path.with_name(f"{index_path.name}.tmp")
+        tmp_path.write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
+        tmp_path.replace(index_path)
+
+
+def fetch_source_audio(args: argparse.Namespace, job: Job) -> Path:
+    """Return job.source_url's audio from the download cache, downloading it on a miss."""
+    if not job.source_url:
+        raise ValueError("Internal error: fetch_source_audio requires job.source_url.")
+    cached_source_stem = download_cache_stem(job.source_url)
+    cached_download_dir = DEFAULT_DOWNLOAD_CACHE_DIR
+    with download_lock(cached_source_stem):
+        source_audio = None if args.no_download_cache else find_cached_download(job.source_url)
+        if source_audio is not None:
+            log_success(f"Reusing cached source audio: {source_audio}")
+            return source_audio
+
+        if not args.dry_run:
+            cached_download_dir.mkdir(parents=True, exist_ok=True)
+        run_command(
+            args,
+            build_yt_dlp_command(args, job, cached_download_dir / cached_source_stem),
+            dry_run=args.dry_run,
+            step_message="Downloading source audio...",
+        )
+        if args.dry_run:
+            return cached_download_dir / f"{cached_source_stem}.mp3"
+        source_audio = find_downloaded_audio(
+            cached_download_dir, stem=cached_source_stem, fresh=True
+        )
+        remember_download(job.source_url, source_audio)
+        return source_audio
 
 
 def run_job(args: argparse.Namespace, job: Job, ordinal: int, total: int) -> Path:
     if not job.voice_name:
         raise ValueError("Internal error: voice_name is required.")
 
+    fingerprint: str | None = None
+    if args.resume:
+        fingerprint = job_fingerprint(args, job)
+        completed_dir = find_completed_job(args, fingerprint)
+        if completed_dir is not None:
+            log_success(f"Job {ordinal}/{total} already completed (--resume): {completed_dir}")
+            return completed_dir
+
     if job.source_url or job.source_path:
         voice_profile_name = validate_clone_voice_name(job.voice_name)
-        voice_profile_version = next_clone_version(args.output_root, voice_profile_name)
-        run_dir = clone_version_dir(args.output_root, voice_profile_name, voice_profile_version)
+        with CLONE_VERSION_LOCK:
+            # Reserve the version directory before another job can pick the same number.
+            voice_profile_version = next_clone_version(args.output_root, voice_profile_name)
+            run_dir = clone_version_dir(args.output_root, voice_profile_name, voice_profile_version)
+            if not args.dry_run:
+                run_dir.mkdir(parents=True, exist_ok=False)
         generation_dir = (
             generation_run_dir(
                 args.output_root,
@@ -1044,7 +1793,8 @@ def run_job(args: argparse.Namespace, job: Job, ordinal: int, total: int) -> Pat
     )
 
     if not args.dry_run:
-        run_dir.mkdir(parents=True, exist_ok=False)
+        if not (job.source_url or job.source_path):
+            run_dir.mkdir(parents=True, exist_ok=False)
         if generation_dir is not None and generation_dir != run_dir:
             generation_dir.mkdir(parents=True, exist_ok=False)
 
@@ -1057,55 +1807,17 @@ def run_job(args: argparse.Namespace, job: Job, ordinal: int, total: int) -> Pat
         if job.source_path:
             source_audio = job.source_path
         else:
-            cached_source_stem = download_cache_stem(job.source_url)
-            cached_download_dir = DEFAULT_DOWNLOAD_CACHE_DIR
-            source_audio = find_downloaded_audio(
-                cached_download_dir,
-                stem=cached_source_stem,
-                required=False,
-            )
-            if source_audio is None:
-                legacy_stem = legacy_youtube_cache_stem(job.source_url)
-                source_audio = find_downloaded_audio(
-                    cached_download_dir,
-                    stem=legacy_stem,
-                    required=False,
-                )
-
-            if source_audio is not None:
-                log_success(f"Reusing cached source audio: {source_audio}")
-            else:
-                if not args.dry_run:
-                    cached_download_dir.mkdir(parents=True, exist_ok=True)
-                run_command(
-                    args,
-                    build_yt_dlp_command(
-                        args,
-                        job,
-                        cached_download_dir / cached_source_stem,
-                    ),
-                    dry_run=args.dry_run,
-                    step_message="Downloading source audio...",
-                )
-                source_audio = (
-                    cached_download_dir / f"{cached_source_stem}.mp3"
-                    if args.dry_run
-                    else find_downloaded_audio(cached_download_dir, stem=cached_source_stem)
-                )
+            source_audio = fetch_source_audio(args, job)
 
-        run_command(
-            args,
-            build_ffmpeg_command(args, source_audio, voice_prompt_wav),
-            dry_run=args.dry_run,
-            step_message="Extracting voice prompt clip...",
-        )
+        extract_voice_prompt(args, source_audio, voice_prompt_wav)
 
         if args.dry_run:
             print_command(["cp", str(voice_prompt_wav), str(voice_profile_wav)])
         else:
             clone_dir_for_profile.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(voice_prompt_wav, voice_profile_wav)
-        export_voice_safetensors(args, voice_prompt_wav, voice_profile_safetensors)
+            clone_file(voice_prompt_wav, voice_profile_wav)
+        with COMPUTE_STAGE_SLOTS:
+            export_voice_safetensors(args, voice_prompt_wav, voice_profile_safetensors)
         log_success(f"Saved voice WAV profile: {voice_profile_wav}")
         log_success(f"Saved voice safetensors profile: {voice_profile_safetensors}")
         voice_reference = voice_profile_wav
@@ -1143,17 +1855,32 @@ def run_job(args: argparse.Namespace, job: Job, ordinal: int, total: int) -> Pat
         if cloned_output_wav is None:
             raise RuntimeError("Internal error: missing generation output path.")
 
-        run_command(
-            args,
-            build_pocket_tts_command(args, job.text, voice_reference, cloned_output_wav),
-            dry_run=args.dry_run,
-            step_message="Generating cloned snippet...",
-        )
+        tts_cache_path: Path | None = None
+        if not args.dry_run and not args.no_tts_cache:
+            tts_cache_path = (
+                DEFAULT_TTS_CACHE_DIR / f"{tts_cache_key(args, job.text, voice_reference)}.wav"
+            )
+
+        if tts_cache_path is not None and tts_cache_path.exists():
+            materialize_file(tts_cache_path, cloned_output_wav)
+            log_success(f"Reusing cached generation: {tts_cache_path}")
+        else:
+            with COMPUTE_STAGE_SLOTS:
+                if args.in_process_generate:
+                    generate_in_process(args, job.text, voice_reference, cloned_output_wav)
+                else:
+                    run_command(
+                        args,
+                        build_pocket_tts_command(args, job.text, voice_reference, cloned_output_wav),
+                        dry_run=args.dry_run,
+                        step_message="Generating cloned snippet...",
+                    )
+            if tts_cache_path is not None:
+                store_in_cache(cloned_output_wav, tts_cache_path)
         output_path = cloned_output_wav
 
     if not args.dry_run:
-        write_manifest(
-            run_dir=run_dir,
+        manifest = build_manifest(
             job=job,
             source_audio=source_audio,
             voice_prompt_wav=voice_prompt_wav,
@@ -1165,28 +1892,92 @@ def run_job(args: argparse.Namespace, job: Job, ordinal: int, total: int) -> Pat
             output_wav=output_path,
             args=args,
         )
+        manifest_dirs = [run_dir]
         if generation_dir is not None and generation_dir != run_dir:
-            write_manifest(
-                run_dir=generation_dir,
-                job=job,
-                source_audio=source_audio,
-                voice_prompt_wav=voice_prompt_wav,
-                voice_profile_name=voice_profile_name,
-                voice_profile_version=voice_profile_version,
-                voice_profile_wav=voice_profile_wav,
-                voice_profile_safetensors=voice_profile_safetensors,
-                voice_reference=voice_reference,
-                output_wav=output_path,
-                args=args,
-            )
+            manifest_dirs.append(generation_dir)
+        write_manifest(manifest_dirs, manifest)
+        if fingerprint is not None:
+            record_completed_job(args, fingerprint, manifest_dirs[-1])
     return generation_dir if generation_dir is not None else run_dir
 
 
+def estimate_job_cost(job: Job) -> tuple[int, int]:
+    """Rough shortest-job-first key: (tier, size), cheapest first.
+
+    Generate-only jobs sort by text length, then clone jobs whose audio is already on
+    disk by file size, then clone jobs that still need a download.
+    """
+    if not (job.source_url or job.source_path):
+        return (0, len(job.text or ""))
+    source_audio = job.source_path
+    if source_audio is None and job.source_url:
+        source_audio = find_cached_download(job.source_url)
+    if source_audio is not None and source_audio.is_file():
+        return (1, source_audio.stat().st_size)
+    return (2, 0)
+
+
+def schedule_jobs(args: argparse.Namespace, jobs: Sequence[Job]) -> list[int]:
+    """Return 0-based job indexes in dispatch order for --schedule."""
+    order = list(range(len(jobs)))
+    if args.schedule == "sjf":
+        costs = [estimate_job_cost(job) for job in jobs]
+        # sort is stable, so equal-cost jobs keep their TSV order.
+        order.sort(key=costs.__getitem__)
+    return order
+
+
+def run_jobs(args: argparse.Namespace, jobs: Sequence[Job]) -> list[Path]:
+    """Run jobs in --schedule order; results come back in the original job order."""
+    global COMPUTE_STAGE_SLOTS
+    COMPUTE_STAGE_SLOTS = threading.Semaphore(args.max_concurrent_gpu_jobs)
+    total = len(jobs)
+    order = schedule_jobs(args, jobs)
+    results: list[Path | None] = [None] * total
+    if args.jobs_concurrency <= 1 or total == 1:
+        if not args.prefetch_downloads or args.dry_run or args.no_download_cache:
+            for index in order:
+                results[index] = run_job(args, jobs[index], index + 1, total)
+            return results
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Download the next job's source while the current job runs; run_job then finds
+        # it in the cache (or waits on its download_lock). A failed prefetch is ignored
+        # here and surfaces again when that job retries the download itself.
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            for position, index in enumerate(order):
+                if position + 1 < len(order):
+                    next_job = jobs[order[position + 1]]
+                    if next_job.source_url:
+                        prefetcher.submit(fetch_source_audio, args, next_job)
+                results[index] = run_job(args, jobs[index], index + 1, total)
+        return results
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Jobs spend most of their time blocked on subprocesses, so threads overlap them well.
+    with ThreadPoolExecutor(max_workers=min(args.jobs_concurrency, total)) as executor:
+        # The executor queue is FIFO, so submission order is dispatch order.
+        futures = {
+            index: executor.submit(run_job, args, jobs[index], index + 1, total)
+            for index in order
+        }
+        try:
+            for index, future in futures.items():
+                results[index] = future.result()
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+    return results
+
+
 def print_failure_hints(error: CommandFailure) -> None:
     stderr = (error.stderr or "") + "\n" + (error.stdout or "")
-    cmd_text = " ".join(error.cmd)
 
-    if "yt-dlp" in cmd_text:
+    # yt-dlp is its own argv element (bare or after `uv run`); no need to join the command.
+    if "yt-dlp" in error.cmd:
         log_warning(
             "\nHint: yt-dlp failures are often fixed by updating yt-dlp and/or "
             "providing cookies. If using UV, run `uv lock --upgrade-package yt-dlp && uv sync` "
@@ -1217,10 +2008,9 @@ def main() -> int:
 
         if not args.dry_run:
             args.output_root.mkdir(parents=True, exist_ok=True)
+            atexit.register(save_download_meta)
 
-        completed: list[Path] = []
-        for index, job in enumerate(jobs, start=1):
-            completed.append(run_job(args, job, index, len(jobs)))
+        completed = run_jobs(args, jobs)
 
     except (ValueError, FileNotFoundError, RuntimeError) as error:
         log_error(f"ERROR: {error}")
@@ -4,13 +4,17 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import operator
+import os
 import re
 import shlex
 import shutil
 import subprocess
 import sys
 import tempfile
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -30,15 +34,40 @@ except ImportError as error:
 
 VOICE_BASE_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
 DEFAULT_SAMPLE_TEXT = "This line is synthesized in the cloned voice."
-PATH_VALUE_FLAGS = {
-    "--output-path",
-    "--output-root",
-    "--voice",
-    "--source-url",
-    "--pipeline-script",
-    "--cookies",
-    "--cookies-file",
-    "--jobs-tsv",
+OUTPUT_TAIL_LINES = 25
+SNIPPET_READ_PARALLEL_MIN = 16
+SNIPPET_PAGE_SIZE = 20
+HF_UPLOAD_THREADS = 8
+HF_WEB_URL = "https://huggingface.co/{repo_id}/blob/main/{remote_path}"
+HF_URI = "hf://{repo_id}/{remote_path}"
+MPS_CPU_TENSOR_ERROR = "Passed CPU tensor to MPS op"
+# Tried in order; the audio path is appended to the first one found on PATH.
+AUDIO_PLAYER_COMMANDS = (
+    ("afplay",),
+    ("ffplay", "-nodisp", "-autoexit", "-loglevel", "error"),
+    ("mpv", "--really-quiet", "--no-video"),
+    ("play", "-q"),
+    ("aplay",),
+)
+PATH_VALUE_FLAGS = frozenset(
+    {
+        "--output-path",
+        "--output-root",
+        "--voice",
+        "--source-url",
+        "--pipeline-script",
+        "--cookies",
+        "--cookies-file",
+        "--jobs-tsv",
+    }
+)
+URL_PREFIXES = ("http://", "https://", "hf://")
+COMMAND_TOKEN_STYLES = {
+    "command": "bold green",
+    "flag": "bold magenta",
+    "arg": "cyan",
+    "path": "bold yellow",
+    "url": "bold blue",
 }
 
 
@@ -50,6 +79,9 @@ class VoiceProfile:
     voice_wav: Path
     voice_safetensors: Path
     manifest: Path
+    # Whether each file was present when the profile was discovered; actions re-check on use.
+    has_wav: bool
+    has_safetensors: bool
 
     @property
     def selector(self) -> str:
@@ -64,6 +96,8 @@ class VoiceSnippet:
     run_name: str | None
     text: str
     output_wav: Path | None
+    # Audio column text for the browser table, formatted once at discovery.
+    display_path: str
 
 
 def parse_args() -> argparse.Namespace:
@@ -95,10 +129,37 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Show full pipeline stdout/stderr instead of quiet mode.",
     )
+    parser.add_argument(
+        "--no-preview",
+        action="store_true",
+        help=(
+            "Print commands as a single shell line instead of the token table. "
+            "Implied when stdout is not a terminal."
+        ),
+    )
     parser.add_argument(
         "--device",
         help="Initial active device (for example: cpu, mps, cuda). If omitted, auto-detected.",
     )
+    parser.add_argument(
+        "--push",
+        action="append",
+        metavar="VOICE",
+        help=(
+            "Upload this voice's voice.safetensors to Hugging Face without the menu "
+            "(for example: stefan or stefan-2). Repeat to push several voices in one commit. "
+            "Requires --repo-id."
+        ),
+    )
+    parser.add_argument(
+        "--repo-id",
+        help="Hugging Face repo id (owner/name) for --push.",
+    )
+    parser.add_argument(
+        "--private",
+        action="store_true",
+        help="With --push, create the repo as private if it doesn't exist yet.",
+    )
     return parser.parse_args()
 
 
@@ -109,25 +170,47 @@ def resolve_pipeline_script(path: Path) -> Path:
     return candidate
 
 
+@functools.lru_cache(maxsize=1)
 def detect_device_capabilities() -> dict[str, bool]:
+    # Probed once per session: the torch import and CUDA/MPS runtime init are slow, and the
+    # answer doesn't change while the menu is open. Callers must not mutate the result.
     capabilities = {"cpu": True, "mps": False, "cuda": False}
+    # Only ask torch about backends this machine could have; importing torch just to
+    # hear "no" costs seconds on a CPU-only box.
+    probe_mps = sys.platform == "darwin"
+    probe_cuda = gpu_driver_present()
+    if not probe_mps and not probe_cuda:
+        return capabilities
     try:
         import torch
     except ImportError:
         return capabilities
 
-    try:
-        capabilities["cuda"] = bool(torch.cuda.is_available())
-    except Exception:
-        pass
-    try:
-        mps_backend = getattr(torch.backends, "mps", None)
-        capabilities["mps"] = bool(mps_backend and mps_backend.is_available())
-    except Exception:
-        pass
+    if probe_cuda:
+        try:
+            capabilities["cuda"] = bool(torch.cuda.is_available())
+        except Exception:
+            pass
+    if probe_mps:
+        try:
+            mps_backend = getattr(torch.backends, "mps", None)
+            capabilities["mps"] = bool(mps_backend and mps_backend.is_available())
+        except Exception:
+            pass
     return capabilities
 
 
+def gpu_driver_present() -> bool:
+    """Cheap check for a driver torch.cuda could use (NVIDIA, or ROCm on Linux)."""
+    if sys.platform == "darwin":
+        return False
+    if sys.platform.startswith("linux") and (
+        os.path.exists("/proc/driver/nvidia/version") or os.path.exists("/dev/kfd")
+    ):
+        return True
+    return shutil.which("nvidia-smi") is not None
+
+
 def detect_default_device() -> str:
     capabilities = detect_device_capabilities()
     if capabilities.get("cuda"):
@@ -137,30 +220,64 @@ def detect_default_device() -> str:
     return "cpu"
 
 
+def list_subdirs(path: Path | str) -> list[os.DirEntry[str]]:
+    with os.scandir(path) as entries:
+        return [entry for entry in entries if entry.is_dir()]
+
+
+def list_entry_names(path: Path | str) -> set[str]:
+    """Names of path's children, so existence checks cost one readdir instead of a stat each."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+
+def dir_mtime_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def invalidate_discovery_caches() -> None:
+    """Drop memoized discovery results; call after anything that may write under the output root."""
+    _discover_voice_snippets_cached.cache_clear()
+
+
 def discover_voice_profiles(output_root: Path) -> list[VoiceProfile]:
-    root = output_root
-    if not root.exists():
+    # Not memoized: a root-mtime key misses versions added inside an existing voice and
+    # voice files written into an existing version, and keying on every level's mtime
+    # would cost the same scandirs as rediscovering.
+    if not output_root.exists():
         return []
-
     profiles: list[VoiceProfile] = []
-    for base_dir in sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.name.lower()):
-        for version_dir in sorted(
-            (p for p in base_dir.iterdir() if p.is_dir() and p.name.isdigit()),
-            key=lambda p: int(p.name),
-        ):
-            voice_wav = version_dir / "voice.wav"
-            voice_safetensors = version_dir / "voice.safetensors"
-            manifest = version_dir / "run_manifest.json"
-            if not voice_wav.exists() and not voice_safetensors.exists():
+    for base_entry in sorted(list_subdirs(output_root), key=lambda entry: entry.name.lower()):
+        # Parse each version number once; it is both the sort key and VoiceProfile.version.
+        versions = sorted(
+            (
+                (int(entry.name), entry.path)
+                for entry in list_subdirs(base_entry.path)
+                if entry.name.isdigit()
+            ),
+            key=operator.itemgetter(0),
+        )
+        for version, version_path in versions:
+            names = list_entry_names(version_path)
+            if "voice.wav" not in names and "voice.safetensors" not in names:
                 continue
+            version_dir = Path(version_path)
             profiles.append(
                 VoiceProfile(
-                    base=base_dir.name,
-                    version=int(version_dir.name),
+                    base=base_entry.name,
+                    version=version,
                     directory=version_dir,
-                    voice_wav=voice_wav,
-                    voice_safetensors=voice_safetensors,
-                    manifest=manifest,
+                    voice_wav=version_dir / "voice.wav",
+                    voice_safetensors=version_dir / "voice.safetensors",
+                    manifest=version_dir / "run_manifest.json",
+                    has_wav="voice.wav" in names,
+                    has_safetensors="voice.safetensors" in names,
                 )
             )
     return profiles
@@ -176,7 +293,7 @@ def print_banner(console: Console) -> None:
     )
 
 
-def print_main_menu(console: Console, active_device: str, auto_device: str) -> None:
+def print_main_menu(console: Console, active_device: str, auto_device: str | None) -> None:
     table = Table(
         title="Actions",
         show_header=True,
@@ -190,7 +307,8 @@ def print_main_menu(console: Console, active_device: str, auto_device: str) -> N
     table.add_row("3", "Push an existing voice to Hugging Face")
     table.add_row(
         "4",
-        f"Set active device (current: {active_device}, auto-detected: {auto_device})",
+        f"Set active device (current: {active_device}"
+        + (f", auto-detected: {auto_device})" if auto_device else ")"),
     )
     table.add_row("5", "Exit")
     console.print(table)
@@ -317,8 +435,8 @@ def select_voice_profile(console: Console, output_root: Path) -> VoiceProfile |
                 versions_table.add_row(
                     str(index),
                     str(profile.version),
-                    "yes" if profile.voice_wav.exists() else "no",
-                    "yes" if profile.voice_safetensors.exists() else "no",
+                    "yes" if profile.has_wav else "no",
+                    "yes" if profile.has_safetensors else "no",
                     str(profile.directory),
                 )
             console.print(versions_table)
@@ -341,24 +459,44 @@ def select_voice_profile(console: Console, output_root: Path) -> VoiceProfile |
 
 def discover_voice_snippets(output_root: Path, profile: VoiceProfile) -> list[VoiceSnippet]:
     snippets_root = output_root / profile.base / str(profile.version) / "runs"
-    if not snippets_root.exists():
+    # Each generation adds a run directory, which bumps runs/'s mtime.
+    mtime_ns = dir_mtime_ns(snippets_root)
+    if mtime_ns is None:
         return []
+    return list(_discover_voice_snippets_cached(snippets_root, mtime_ns))
+
+
+def read_run_dir(run_dir: str) -> tuple[set[str], dict[str, object] | None]:
+    """Return a run directory's entry names and its parsed run_manifest.json (None if absent or bad)."""
+    names = list_entry_names(run_dir)
+    if "run_manifest.json" not in names:
+        return names, None
+    try:
+        # One read of the raw bytes; json.loads detects UTF-8 itself.
+        manifest_data = json.loads(Path(run_dir, "run_manifest.json").read_bytes())
+    except (ValueError, OSError):
+        return names, None
+    return names, manifest_data if isinstance(manifest_data, dict) else None
+
 
+@functools.lru_cache(maxsize=32)
+def _discover_voice_snippets_cached(snippets_root: Path, mtime_ns: int) -> tuple[VoiceSnippet, ...]:
     snippets: list[VoiceSnippet] = []
-    run_dirs = sorted(
-        (path for path in snippets_root.iterdir() if path.is_dir()),
-        key=lambda path: path.name,
-        reverse=True,
-    )
-    for run_dir in run_dirs:
+    run_entries = sorted(list_subdirs(snippets_root), key=lambda entry: entry.name, reverse=True)
+    run_dir_paths = [entry.path for entry in run_entries]
+    if len(run_dir_paths) > SNIPPET_READ_PARALLEL_MIN:
+        # Listing and manifest reads are independent small I/O; overlap them on big libraries.
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(16, len(run_dir_paths))) as executor:
+            run_dir_contents = list(executor.map(read_run_dir, run_dir_paths))
+    else:
+        run_dir_contents = [read_run_dir(path) for path in run_dir_paths]
+
+    for run_dir_path, (names, manifest_data) in zip(run_dir_paths, run_dir_contents):
+        run_dir = Path(run_dir_path)
         manifest_path = run_dir / "run_manifest.json"
-        manifest_data: dict[str, object] | None = None
-        if manifest_path.exists():
-            try:
-                with manifest_path.open("r", encoding="utf-8") as handle:
-                    manifest_data = json.load(handle)
-            except (json.JSONDecodeError, OSError):
-                manifest_data = None
+        has_manifest = "run_manifest.json" in names
 
         created_at = (
             str(manifest_data.get("created_at"))
@@ -387,35 +525,40 @@ def discover_voice_snippets(output_root: Path, profile: VoiceProfile) -> list[Vo
 
         if output_wav is None:
             fallback = run_dir / "cloned_output.wav"
-            output_wav = fallback if fallback.exists() else None
+            output_wav = fallback if "cloned_output.wav" in names else None
 
         snippets.append(
             VoiceSnippet(
                 run_dir=run_dir,
-                manifest=manifest_path if manifest_path.exists() else None,
+                manifest=manifest_path if has_manifest else None,
                 created_at=created_at,
                 run_name=run_name_value,
                 text=text_value,
                 output_wav=output_wav,
+                display_path=str(output_wav) if output_wav else "(missing)",
             )
         )
-    return snippets
+    return tuple(snippets)
 
 
-def build_audio_play_command(audio_path: Path) -> list[str] | None:
-    if shutil.which("afplay"):
-        return ["afplay", str(audio_path)]
-    if shutil.which("ffplay"):
-        return ["ffplay", "-nodisp", "-autoexit", "-loglevel", "error", str(audio_path)]
-    if shutil.which("mpv"):
-        return ["mpv", "--really-quiet", "--no-video", str(audio_path)]
-    if shutil.which("play"):
-        return ["play", "-q", str(audio_path)]
-    if shutil.which("aplay"):
-        return ["aplay", str(audio_path)]
+@functools.lru_cache(maxsize=1)
+def find_audio_player() -> tuple[str, ...] | None:
+    # PATH doesn't change under a running session; search it once, not per played snippet.
+    # The resolved absolute path also lets subprocess launch the player via posix_spawn.
+    for player_cmd in AUDIO_PLAYER_COMMANDS:
+        player_path = shutil.which(player_cmd[0])
+        if player_path:
+            return (player_path, *player_cmd[1:])
     return None
 
 
+def build_audio_play_command(audio_path: Path) -> list[str] | None:
+    player_cmd = find_audio_player()
+    if player_cmd is None:
+        return None
+    return [*player_cmd, str(audio_path)]
+
+
 def play_audio_path(console: Console, audio_path: Path, dry_run: bool) -> bool:
     if not audio_path.exists():
         console.print(f"Audio file missing: {audio_path}", style="bold red")
@@ -434,11 +577,15 @@ def play_audio_path(console: Console, audio_path: Path, dry_run: bool) -> bool:
         console.print(f"Dry run: {shlex.join(command)}", style="bold yellow")
         return True
 
+    # With an absolute executable and close_fds=False, subprocess uses posix_spawn instead of
+    # fork, which avoids copying page tables of a process that may have imported torch.
+    # Descriptors Python opens are non-inheritable, so nothing extra leaks to the player.
     result = subprocess.run(
         command,
         check=False,
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL,
+        close_fds=False,
     )
     if result.returncode != 0:
         console.print(
@@ -467,9 +614,14 @@ def browse_snippets_flow(console: Console, args: argparse.Namespace, profile: Vo
         )
         return
 
+    # Only one page of rows is built per redraw, so large libraries redraw as fast as small ones.
+    page_count = (len(snippets) + SNIPPET_PAGE_SIZE - 1) // SNIPPET_PAGE_SIZE
+    page = 0
     while True:
+        page_start = page * SNIPPET_PAGE_SIZE
         table = Table(
             title=f"Snippets for {profile.selector}",
+            caption=f"Page {page + 1}/{page_count}" if page_count > 1 else None,
             show_header=True,
             header_style="bold magenta",
             border_style="blue",
@@ -479,19 +631,29 @@ def browse_snippets_flow(console: Console, args: argparse.Namespace, profile: Vo
         table.add_column("Run name")
         table.add_column("Text", overflow="fold")
         table.add_column("Audio", style="dim")
-        for index, snippet in enumerate(snippets, start=1):
+        for index, snippet in enumerate(
+            snippets[page_start : page_start + SNIPPET_PAGE_SIZE],
+            start=page_start + 1,
+        ):
             table.add_row(
                 str(index),
                 snippet.created_at,
                 snippet.run_name or "",
                 snippet.text or "",
-                str(snippet.output_wav) if snippet.output_wav else "(missing)",
+                snippet.display_path,
             )
         console.print(table)
 
-        choice_raw = Prompt.ask("Select snippet # to play (blank to go back)", default="").strip()
+        prompt_text = "Select snippet # to play (blank to go back)"
+        if page_count > 1:
+            prompt_text = "Select snippet # to play, n/p for next/previous page (blank to go back)"
+        choice_raw = Prompt.ask(prompt_text, default="").strip()
         if choice_raw == "":
             return
+        if page_count > 1 and choice_raw.lower() in ("n", "p"):
+            step = 1 if choice_raw.lower() == "n" else -1
+            page = (page + step) % page_count
+            continue
         if not choice_raw.isdigit():
             console.print("Enter a valid snippet number.", style="bold red")
             continue
@@ -522,15 +684,22 @@ def print_voice_actions_menu(console: Console, profile: VoiceProfile) -> None:
 
 
 def classify_command_value(token: str, previous_flag: str | None) -> str:
-    if token.startswith(("http://", "https://", "hf://")):
+    if token.startswith(URL_PREFIXES):
         return "url"
     if previous_flag in PATH_VALUE_FLAGS:
         return "path"
-    if "/" in token or token.startswith(("./", "../", "~")):
+    # "./" and "../" already contain a slash.
+    if "/" in token or token.startswith("~"):
         return "path"
     return "arg"
 
 
+@functools.lru_cache(maxsize=512)
+def quote_for_preview(token: str) -> str:
+    # Flags, devices, and paths repeat across every preview in a session.
+    return escape(shlex.quote(token))
+
+
 def render_command_preview(cmd: list[str]) -> Table:
     table = Table(
         show_header=True,
@@ -543,13 +712,6 @@ def render_command_preview(cmd: list[str]) -> Table:
     table.add_column("Kind", width=8)
     table.add_column("Token", overflow="fold")
 
-    token_styles = {
-        "command": "bold green",
-        "flag": "bold magenta",
-        "arg": "cyan",
-        "path": "bold yellow",
-        "url": "bold blue",
-    }
     previous_flag: str | None = None
     for index, token in enumerate(cmd):
         if index == 0:
@@ -562,8 +724,8 @@ def render_command_preview(cmd: list[str]) -> Table:
             kind = classify_command_value(token, previous_flag)
             previous_flag = None
 
-        style = token_styles.get(kind, "white")
-        quoted_token = escape(shlex.quote(token))
+        style = COMMAND_TOKEN_STYLES.get(kind, "white")
+        quoted_token = quote_for_preview(token)
         table.add_row(
             str(index),
             f"[{style}]{kind}[/{style}]",
@@ -572,6 +734,43 @@ def render_command_preview(cmd: list[str]) -> Table:
     return table
 
 
+def mps_device_arg_index(cmd: list[str]) -> int | None:
+    """Index of the "mps" value in a `pocket-tts ... --device mps` command, else None."""
+    if not cmd or Path(cmd[0]).name != "pocket-tts" or "--device" not in cmd:
+        return None
+    value_index = cmd.index("--device") + 1
+    if value_index < len(cmd) and cmd[value_index] == "mps":
+        return value_index
+    return None
+
+
+def run_quietly(cmd: list[str], *, watch_mps_error: bool = False) -> tuple[int, list[str], bool]:
+    """Run cmd with stdout and stderr merged, keeping only the last OUTPUT_TAIL_LINES lines.
+
+    Returns (returncode, tail lines, whether MPS_CPU_TENSOR_ERROR was printed); the
+    marker is only looked for when watch_mps_error is set.
+    Raises FileNotFoundError if cmd[0] cannot be executed.
+    """
+    tail: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+    mps_error_seen = False
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        # A stray non-UTF-8 byte must not abort the read loop and lose the tail.
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+    ) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            if watch_mps_error and not mps_error_seen and MPS_CPU_TENSOR_ERROR in line:
+                mps_error_seen = True
+            tail.append(line.rstrip("\n"))
+    return proc.returncode, list(tail), mps_error_seen
+
+
 def run_command_with_output_handling(
     console: Console,
     cmd: list[str],
@@ -581,91 +780,85 @@ def run_command_with_output_handling(
     dry_run: bool,
     verbose_output: bool,
     success_message: str | None = None,
+    show_preview_table: bool = True,
 ) -> bool:
-    console.print(
-        Panel(
-            render_command_preview(cmd),
-            title=title,
-            border_style="cyan",
-            expand=False,
+    if show_preview_table and console.is_terminal:
+        console.print(
+            Panel(
+                render_command_preview(cmd),
+                title=title,
+                border_style="cyan",
+                expand=False,
+            )
         )
-    )
+    else:
+        # Scripted runs don't need the per-token table; one copy-pasteable line is enough.
+        console.print(f"$ {shlex.join(cmd)}", markup=False, highlight=False)
     if dry_run:
         console.print("Dry run enabled; command not executed.", style="bold yellow")
         return True
 
     if verbose_output:
         try:
-            result = subprocess.run(cmd, check=False)
+            returncode = subprocess.run(cmd, check=False).returncode
         except FileNotFoundError as error:
             console.print(f"Command not found: {cmd[0]}", style="bold red")
             console.print(str(error), style="dim")
             return False
-    else:
-        try:
-            with console.status(status_text):
-                result = subprocess.run(
-                    cmd,
-                    check=False,
-                    capture_output=True,
-                    text=True,
-                )
-        except FileNotFoundError as error:
-            console.print(f"Command not found: {cmd[0]}", style="bold red")
-            console.print(str(error), style="dim")
+        if returncode != 0:
+            console.print(f"Command failed with exit code {returncode}.", style="bold red")
             return False
+        return True
 
-    if result.returncode != 0:
-        combined_output = ""
-        if not verbose_output:
-            combined_output = ((result.stderr or "").strip() + "\n" + (result.stdout or "").strip()).strip()
-
-            # Retry once on CPU for a known MPS runtime mismatch.
-            if cmd and Path(cmd[0]).name == "pocket-tts" and "--device" in cmd:
-                device_arg_index = cmd.index("--device")
-                if device_arg_index + 1 < len(cmd) and cmd[device_arg_index + 1] == "mps":
-                    if "Passed CPU tensor to MPS op" in combined_output:
-                        fallback_cmd = cmd.copy()
-                        fallback_cmd[device_arg_index + 1] = "cpu"
-                        console.print(
-                            "MPS runtime mismatch detected. Retrying once on CPU...",
-                            style="bold yellow",
-                        )
-                        with console.status("Retrying on CPU..."):
-                            retry_result = subprocess.run(
-                                fallback_cmd,
-                                check=False,
-                                capture_output=True,
-                                text=True,
-                            )
-                        if retry_result.returncode == 0:
-                            if success_message:
-                                console.print(
-                                    f"{success_message} (CPU fallback after MPS error).",
-                                    style="bold green",
-                                )
-                            return True
-                        result = retry_result
-                        combined_output = (
-                            ((result.stderr or "").strip() + "\n" + (result.stdout or "").strip()).strip()
-                        )
+    # Stream the child's output and keep only the tail we show on failure, so a chatty
+    # pipeline run never accumulates its whole log in memory.
+    mps_value_index = mps_device_arg_index(cmd)
+    try:
+        with console.status(status_text):
+            returncode, tail, mps_error_seen = run_quietly(
+                cmd,
+                watch_mps_error=mps_value_index is not None,
+            )
+    except FileNotFoundError as error:
+        console.print(f"Command not found: {cmd[0]}", style="bold red")
+        console.print(str(error), style="dim")
+        return False
+
+    if returncode != 0:
+        # Retry once on CPU for a known MPS runtime mismatch.
+        if mps_error_seen and mps_value_index is not None:
+            fallback_cmd = cmd.copy()
+            fallback_cmd[mps_value_index] = "cpu"
+            console.print(
+                "MPS runtime mismatch detected. Retrying once on CPU...",
+                style="bold yellow",
+            )
+            with console.status("Retrying on CPU..."):
+                returncode, tail, _ = run_quietly(fallback_cmd)
+            if returncode == 0:
+                if success_message:
+                    console.print(
+                        f"{success_message} (CPU fallback after MPS error).",
+                        style="bold green",
+                    )
+                return True
 
         console.print(
-            f"Command failed with exit code {result.returncode}.",
+            f"Command failed with exit code {returncode}.",
             style="bold red",
         )
-        if not verbose_output and combined_output:
-            tail_lines = "\n".join(combined_output.splitlines()[-25:])
+        tail_text = "\n".join(tail).strip()
+        if tail_text:
             console.print(
                 Panel.fit(
-                    tail_lines,
-                    title="Command Output (last 25 lines)",
+                    tail_text,
+                    title=f"Command Output (last {OUTPUT_TAIL_LINES} lines)",
                     border_style="red",
                 )
             )
         return False
 
-    if not verbose_output and success_message:
+    if success_message:
         console.print(success_message, style="bold green")
     return True
 
@@ -676,12 +869,13 @@ def run_pipeline(
     pipeline_args: list[str],
     dry_run: bool,
     verbose_output: bool,
+    show_preview_table: bool = True,
 ) -> bool:
     effective_args = list(pipeline_args)
     if verbose_output and "--verbose-command-output" not in effective_args:
         effective_args.append("--verbose-command-output")
     cmd = [sys.executable, str(pipeline_script), *effective_args]
-    return run_command_with_output_handling(
+    success = run_command_with_output_handling(
         console,
         cmd,
         title="Pipeline Command",
@@ -689,7 +883,12 @@ def run_pipeline(
         dry_run=dry_run,
         verbose_output=verbose_output,
         success_message="Pipeline run completed.",
+        show_preview_table=show_preview_table,
     )
+    if not dry_run:
+        # Even a failed run may have left a new version or run directory behind.
+        invalidate_discovery_caches()
+    return success
 
 
 def clone_voice_flow(
@@ -739,6 +938,7 @@ def clone_voice_flow(
         pipeline_args,
         dry_run=args.dry_run,
         verbose_output=args.verbose_pipeline,
+        show_preview_table=not args.no_preview,
     )
 
 
@@ -779,6 +979,7 @@ def generate_for_profile_flow(
         pipeline_args,
         dry_run=args.dry_run,
         verbose_output=args.verbose_pipeline,
+        show_preview_table=not args.no_preview,
     )
 
 
@@ -823,6 +1024,7 @@ def generate_and_play_temp_for_profile_flow(
             dry_run=True,
             verbose_output=args.verbose_pipeline,
             success_message=None,
+            show_preview_table=not args.no_preview,
         )
         if success:
             console.print(
@@ -853,6 +1055,7 @@ def generate_and_play_temp_for_profile_flow(
             dry_run=False,
             verbose_output=args.verbose_pipeline,
             success_message="Temporary snippet generated.",
+            show_preview_table=not args.no_preview,
         )
         if not success:
             return
@@ -888,17 +1091,41 @@ def voice_library_flow(
             return
 
 
+@functools.lru_cache(maxsize=4)
+def get_hf_api(token: str):
+    """One HfApi per token for the session; huggingface_hub pools its HTTP connections
+    in a shared session, so repeat pushes also reuse the open connection to the Hub."""
+    from huggingface_hub import HfApi
+
+    return HfApi(token=token)
+
+
+def select_upload_profiles(console: Console, output_root: Path) -> list[VoiceProfile]:
+    """Pick one or more voices whose embeddings should go up in a single commit."""
+    profiles: list[VoiceProfile] = []
+    while True:
+        profile = select_voice_profile(console, output_root)
+        if profile is None:
+            return profiles
+        if not profile.voice_safetensors.exists():
+            console.print(
+                f"Missing required file: {profile.voice_safetensors}",
+                style="bold red",
+            )
+        elif profile in profiles:
+            console.print(f"{profile.selector} is already in this upload.", style="bold yellow")
+        else:
+            profiles.append(profile)
+        if profiles and not Confirm.ask("Add another voice to this upload?", default=False):
+            return profiles
+        if not profiles:
+            return profiles
+
+
 def push_to_hugging_face_flow(console: Console, args: argparse.Namespace) -> None:
     console.print(Panel.fit("Push Voice to Hugging Face", border_style="bright_blue"))
-    profile = select_voice_profile(console, args.output_root)
-    if profile is None:
-        return
-
-    if not profile.voice_safetensors.exists():
-        console.print(
-            f"Missing required file: {profile.voice_safetensors}",
-            style="bold red",
-        )
+    profiles = select_upload_profiles(console, args.output_root)
+    if not profiles:
         return
 
     repo_id = Prompt.ask("Hugging Face repo id (owner/name)").strip()
@@ -907,9 +1134,34 @@ def push_to_hugging_face_flow(console: Console, args: argparse.Namespace) -> Non
         return
 
     private_repo = Confirm.ask("Create repo as private?", default=False)
-    upload_file = profile.voice_safetensors
-    remote_filename = f"{profile.selector}.safetensors"
-    remote_path = f"embeddings/{remote_filename}"
+    upload_voice_embeddings(
+        console,
+        profiles,
+        repo_id=repo_id,
+        private_repo=private_repo,
+        dry_run=args.dry_run,
+        interactive=True,
+    )
+
+
+def upload_voice_embeddings(
+    console: Console,
+    profiles: list[VoiceProfile],
+    *,
+    repo_id: str,
+    private_repo: bool,
+    dry_run: bool,
+    interactive: bool,
+) -> bool:
+    """Commit the profiles' voice.safetensors files to repo_id in one Hub commit.
+
+    Non-interactive callers skip the confirmation prompt, and fail instead of prompting
+    when no Hugging Face token is saved.
+    """
+    uploads = [
+        (profile.voice_safetensors, f"embeddings/{profile.selector}.safetensors")
+        for profile in profiles
+    ]
 
     table = Table(
         title="Upload Plan",
@@ -919,34 +1171,36 @@ def push_to_hugging_face_flow(console: Console, args: argparse.Namespace) -> Non
     )
     table.add_column("Local file", style="white")
     table.add_column("Remote path", style="cyan")
-    table.add_row(str(upload_file), remote_path)
+    for upload_file, remote_path in uploads:
+        table.add_row(str(upload_file), remote_path)
     console.print(table)
 
-    if not Confirm.ask("Proceed with upload?", default=True):
+    if interactive and not Confirm.ask("Proceed with upload?", default=True):
         console.print("Upload canceled.", style="bold yellow")
-        return
+        return False
 
-    if args.dry_run:
+    if dry_run:
         console.print("Dry run enabled; skipping Hugging Face upload.", style="bold yellow")
-        return
+        return True
 
     try:
-        from huggingface_hub import HfApi, get_token
-        from huggingface_hub.utils import (
-            HfHubHTTPError,
-            are_progress_bars_disabled,
-            disable_progress_bars,
-            enable_progress_bars,
-        )
+        from huggingface_hub import CommitOperationAdd, get_token
+        from huggingface_hub.utils import HfHubHTTPError, RepositoryNotFoundError
     except ImportError as error:
         console.print(
             "This flow requires `huggingface_hub`. Run `uv sync` to install dependencies.",
             style="bold red",
         )
         console.print(str(error), style="dim")
-        return
+        return False
 
     token = get_token()
+    if not token and not interactive:
+        console.print(
+            "No Hugging Face token found. Run `uvx hf auth login` or set HF_TOKEN.",
+            style="bold red",
+        )
+        return False
     if not token:
         console.print(
             "No Hugging Face token found. Run `uvx hf auth login` first, "
@@ -956,51 +1210,117 @@ def push_to_hugging_face_flow(console: Console, args: argparse.Namespace) -> Non
         token = Prompt.ask("HF token (blank to cancel)", default="", password=True).strip()
         if token == "":
             console.print("Upload canceled.", style="bold yellow")
-            return
+            return False
+
+    api = get_hf_api(token)
+    upload_label = uploads[0][0].name if len(uploads) == 1 else f"{len(uploads)} voice embeddings"
+    commit_message = (
+        f"Upload {uploads[0][1]}"
+        if len(uploads) == 1
+        else f"Upload {len(uploads)} voice embeddings"
+    )
 
-    api = HfApi(token=token)
-    progress_bars_were_disabled = are_progress_bars_disabled()
+    def commit_voice_files() -> None:
+        # All selected embeddings land in one commit: one commit round trip and one
+        # repo-side lock, however many voices are pushed.
+        api.create_commit(
+            repo_id=repo_id,
+            repo_type="model",
+            operations=[
+                CommitOperationAdd(path_in_repo=remote_path, path_or_fileobj=str(upload_file))
+                for upload_file, remote_path in uploads
+            ],
+            commit_message=commit_message,
+            # create_commit uploads the files' content on its own thread pool before the commit.
+            num_threads=min(HF_UPLOAD_THREADS, len(uploads)),
+        )
+
+    # No Rich spinner here: huggingface_hub draws its own upload progress, and a live
+    # display repainting over it would only fight for the terminal.
+    console.print(f"Uploading {upload_label}...", style="bold")
     try:
-        disable_progress_bars()
-        with console.status("Creating or reusing model repo..."):
+        # Repeat uploads usually target an existing repo, so upload first and only pay the
+        # create_repo round trip when the Hub says the repo doesn't exist yet.
+        try:
+            commit_voice_files()
+        except RepositoryNotFoundError:
+            console.print(f"Creating model repo {repo_id}...", style="bold")
             api.create_repo(
                 repo_id=repo_id,
                 repo_type="model",
                 private=private_repo,
                 exist_ok=True,
             )
-        with console.status(f"Uploading {upload_file.name}..."):
-            api.upload_file(
-                path_or_fileobj=str(upload_file),
-                path_in_repo=remote_path,
-                repo_id=repo_id,
-                repo_type="model",
-            )
+            commit_voice_files()
     except HfHubHTTPError as error:
         console.print(f"Hugging Face upload failed: {error}", style="bold red")
-        return
+        return False
     except Exception as error:  # pragma: no cover - defensive path
         console.print(f"Unexpected upload failure: {error}", style="bold red")
-        return
-    finally:
-        if not progress_bars_were_disabled:
-            enable_progress_bars()
+        return False
 
-    hf_voice_url = f"hf://{repo_id}/{remote_path}"
-    console.print(
-        f"Uploaded voice embedding to https://huggingface.co/{repo_id}/blob/main/{remote_path}",
-        style="bold green",
-    )
-    console.print(
-        f"Embedding URL: {hf_voice_url}",
-        style="bold cyan",
+    for _upload_file, remote_path in uploads:
+        url_fields = {"repo_id": repo_id, "remote_path": remote_path}
+        console.print(
+            f"Uploaded voice embedding to {HF_WEB_URL.format_map(url_fields)}",
+            style="bold green",
+        )
+        console.print(
+            f"Embedding URL: {HF_URI.format_map(url_fields)}",
+            style="bold cyan",
+        )
+    return True
+
+
+def find_voice_profile(output_root: Path, selector: str) -> VoiceProfile | None:
+    """Resolve "name" (version 1) or "name-N" the way the pipeline's --voice does."""
+    base, _, version_text = selector.strip().rpartition("-")
+    if not base or not version_text.isdigit():
+        base, version_text = selector.strip(), "1"
+    version = int(version_text)
+    for profile in discover_voice_profiles(output_root):
+        if profile.base.lower() == base.lower() and profile.version == version:
+            return profile
+    return None
+
+
+def push_from_args(console: Console, args: argparse.Namespace) -> int:
+    if not args.repo_id or "/" not in args.repo_id:
+        console.print("--push requires --repo-id owner/name.", style="bold red")
+        return 2
+
+    profiles: list[VoiceProfile] = []
+    for selector in args.push:
+        profile = find_voice_profile(args.output_root, selector)
+        if profile is None:
+            console.print(f"Voice not found under {args.output_root}: {selector}", style="bold red")
+            return 2
+        if not profile.voice_safetensors.exists():
+            console.print(f"Missing required file: {profile.voice_safetensors}", style="bold red")
+            return 2
+        if profile not in profiles:
+            profiles.append(profile)
+
+    uploaded = upload_voice_embeddings(
+        console,
+        profiles,
+        repo_id=args.repo_id.strip(),
+        private_repo=args.private,
+        dry_run=args.dry_run,
+        interactive=False,
     )
+    return 0 if uploaded else 1
 
 
 def main() -> int:
     args = parse_args()
     console = Console()
-    auto_device = detect_default_device()
+    if args.push:
+        # Scripted push: no menu, no device probe, no pipeline script needed.
+        return push_from_args(console, args)
+
+    # An explicit --device means torch isn't needed until the device screen is opened.
+    auto_device = None if args.device else detect_default_device()
     active_device = args.device.strip() if args.device else auto_device
 
     try:
@@ -1009,8 +1329,11 @@ def main() -> int:
         console.print(str(error), style="bold red")
         return 2
 
-    print_banner(console)
-    console.print(f"Active device: [bold cyan]{active_device}[/] (auto-detected: {auto_device})")
+    # Console as a context manager holds output until exit: banner and status go out in one write.
+    with console:
+        print_banner(console)
+        auto_note = f" (auto-detected: {auto_device})" if auto_device else ""
+        console.print(f"Active device: [bold cyan]{active_device}[/]{auto_note}")
 
     while True:
         print_main_menu(console, active_device=active_device, auto_device=auto_device)
@@ -1023,6 +1346,8 @@ def main() -> int:
             push_to_hugging_face_flow(console, args)
         elif choice == 4:
             active_device = set_active_device_flow(console, active_device)
+            # The device screen has probed by now, so this is a cached lookup.
+            auto_device = detect_default_device()
         else:
             console.print("Bye.", style="bold cyan")
             return 0